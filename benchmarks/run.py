@@ -0,0 +1,284 @@
+"""Benchmark runner for database collector
+
+Usage (from the repository root):
+    python -m benchmarks.run --layout mixed --files 20000 --output result.json
+    python -m benchmarks.run --compare old.json new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from benchmarks.synthetic import LAYOUTS, make_tree
+from data_collect import Collector
+from material import Condition, Directory
+
+OPERATIONS = (
+    "collector_init",
+    "get_path",
+    "get_path_serialized",
+    "group_dir_file",
+    "clone",
+    "incarnate",
+    "remove_member",
+)
+
+
+def dirc_names(*prefixes: str) -> List[str]:
+    """Every name of the numbered directories of the mixed layout with 'prefixes'.
+
+    Literal names match the same directories with the baseline API, which has
+    no directory globs, so results of both trees can be compared.
+    """
+    return [f"{prefix}_{j:02d}" for prefix in prefixes for j in range(100)]
+
+
+def build_conditions() -> Dict[str, List[Condition]]:
+    """Conditions of increasing complexity."""
+    simple = Condition().specify_extention(["wav"])
+
+    medium = (
+        Condition()
+        .specify_extention(["wav", "txt"])
+        .add_exclude_dirc(dirc_names("cache", ".git"))
+        .add_exclude_filename(["noise"])
+    )
+
+    complex_1 = (
+        Condition()
+        .specify_extention(["json", "png"])
+        .add_contain_dirc(dirc_names("set", "spk"))
+        .only_terminal()
+    )
+    complex_2 = (
+        Condition()
+        .specify_exclude_extention(["py"])
+        .add_contain_filename(["utt"])
+        .add_condition_func(lambda path: len(path) % 3 != 0)
+    )
+
+    return {
+        "simple": [simple],
+        "medium": [medium],
+        "complex": [medium, complex_1, complex_2],
+    }
+
+
+def measure(
+    run: Callable[[Any], Any],
+    setup: Callable[[], Any] = None,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """Measure wall time of 'repeat' runs & peak traced memory of one more run.
+
+    'setup' is called before every run (outside of the measurement) & its
+    return value is passed to 'run'.
+    """
+    seconds = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        run(arg)
+        seconds.append(time.perf_counter() - start)
+
+    arg = setup() if setup is not None else None
+    tracemalloc.start()
+    try:
+        run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": seconds,
+        "min": min(seconds),
+        "median": statistics.median(seconds),
+        "peak_bytes": peak,
+    }
+
+
+def bench_condition(
+    root: str,
+    work_dir: str,
+    conditions: List[Condition],
+    operations: List[str],
+    repeat: int,
+) -> Dict[str, Dict[str, Any]]:
+    """Run 'operations' for one set of conditions."""
+    results = {}
+    collector = Collector(conditions, root)
+    database = collector.get_directory_instance()
+    nested = collector.get_path()
+
+    def fresh_dirc(name: str) -> str:
+        path = os.path.join(work_dir, name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        return path
+
+    def copied_tree() -> Directory:
+        path = fresh_dirc("remove")
+        shutil.copytree(root, path, copy_function=os.link, dirs_exist_ok=True)
+        return Directory(path).build_structure()
+
+    def filtered_clone(_) -> Directory:
+        # files of a clone are selected on first access, select them all here
+        clone = database.clone(conditions)
+        stack = [clone]
+        while stack:
+            dirc = stack.pop()
+            len(dirc.file_member)
+            stack += dirc.dirc_member
+        return clone
+
+    cases = {
+        "collector_init": (lambda _: Collector(conditions, root), None),
+        "get_path": (lambda _: collector.get_path(), None),
+        "get_path_serialized": (lambda _: collector.get_path(serialize=True), None),
+        "group_dir_file": (lambda _: Collector.group_dir_file(nested), None),
+        "clone": (filtered_clone, None),
+        "incarnate": (
+            lambda path: database.incarnate(path, conditions, printer=None),
+            lambda: fresh_dirc("incarnate"),
+        ),
+        "remove_member": (
+            lambda dirc: dirc.remove_member(conditions, printer=None),
+            copied_tree,
+        ),
+    }
+    for operation in operations:
+        run, setup = cases[operation]
+        results[operation] = measure(run, setup, repeat)
+
+    return results
+
+
+def get_revision() -> str | None:
+    """Git revision of the benchmarked tree, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    """Generate the trees & run every benchmark."""
+    conditions = build_conditions()
+    condition_names = args.conditions or list(conditions)
+    operations = args.operations or list(OPERATIONS)
+
+    report = {
+        "meta": {
+            "revision": get_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "files": args.files,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [],
+    }
+
+    base_dir = tempfile.mkdtemp(prefix="collector_bench_", dir=args.work_dir)
+    try:
+        for layout in args.layout or LAYOUTS:
+            root = os.path.join(base_dir, layout)
+            number = make_tree(root, layout, args.files, args.seed, args.file_size)
+            for name in condition_names:
+                results = bench_condition(
+                    root, base_dir, conditions[name], operations, args.repeat
+                )
+                for operation, result in results.items():
+                    report["results"].append(
+                        {
+                            "layout": layout,
+                            "condition": name,
+                            "operation": operation,
+                            **number,
+                            **result,
+                        }
+                    )
+                    print(
+                        f"{layout:>10} {name:>8} {operation:>20}: "
+                        f"{result['median'] * 1000:10.2f} ms "
+                        f"{result['peak_bytes'] / 2**20:8.2f} MiB",
+                        file=sys.stderr,
+                    )
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+    return report
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print the median time & peak memory ratios (new / old) of two reports."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    def key(result: Dict[str, Any]):
+        return result["layout"], result["condition"], result["operation"]
+
+    old_results = {key(result): result for result in old["results"]}
+    for result in new["results"]:
+        before = old_results.get(key(result))
+        if before is None:
+            continue
+        time_ratio = result["median"] / max(before["median"], 1e-9)
+        memory_ratio = result["peak_bytes"] / max(before["peak_bytes"], 1)
+        print(
+            f"{' '.join(key(result)):>48}: time x{time_ratio:6.3f}  memory x{memory_ratio:6.3f}"
+        )
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", nargs="*", choices=LAYOUTS)
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--file-size", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--conditions", nargs="*", choices=list(build_conditions()))
+    parser.add_argument("--operations", nargs="*", choices=OPERATIONS)
+    parser.add_argument("--work-dir", default=None, help="Where trees are generated.")
+    parser.add_argument("--output", default=None, help="JSON output (default: stdout).")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run_benchmarks(args)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
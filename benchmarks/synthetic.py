@@ -0,0 +1,106 @@
+"""Synthetic dataset trees for database collector benchmarks"""
+
+from __future__ import annotations
+
+import os
+import random
+import shutil
+from typing import Dict, List
+
+LAYOUTS = ("wide", "deep", "many_small", "mixed")
+
+EXTENTIONS = ("wav", "txt", "json", "png", "py")
+
+
+def _write_files(path: str, names: List[str], size: int) -> None:
+    payload = b"x" * size
+    for name in names:
+        with open(os.path.join(path, name), "wb") as f:
+            f.write(payload)
+
+
+def make_tree(
+    root: str,
+    layout: str = "mixed",
+    files: int = 10000,
+    seed: int = 0,
+    file_size: int = 0,
+) -> Dict[str, int]:
+    """Generate a synthetic dataset tree under 'root' (removed first if it exists).
+
+    Layouts:
+        wide: one level of many directories holding a few files each.
+        deep: chains of nested directories, a few files on every level.
+        many_small: a few directories holding many files each.
+        mixed: randomly nested directories, mixed extentions & names,
+            excluded-looking directories ("cache", ".git") included.
+
+    Args:
+        root (str): Root directory of the tree.
+        layout (str, optional): One of LAYOUTS. Defaults to "mixed".
+        files (int, optional): Approximate number of files. Defaults to 10000.
+        seed (int, optional): Random seed, the same seed gives the same tree. Defaults to 0.
+        file_size (int, optional): Bytes written into every file. Defaults to 0.
+
+    Returns:
+        Dict[str, int]: Number of generated "files" & "dircs".
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"'layout' must be one of {LAYOUTS}, but got '{layout}'.")
+
+    rand = random.Random(seed)
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+
+    # (directory path relative to root, number of files) in creation order
+    plan = []
+    if layout == "wide":
+        per_dirc = 4
+        for i in range(max(files // per_dirc, 1)):
+            plan.append((f"spk_{i:06d}", per_dirc))
+    elif layout == "deep":
+        depth = 32
+        per_level = 2
+        for i in range(max(files // (depth * per_level), 1)):
+            route = [f"chain_{i:04d}"]
+            for level in range(depth):
+                plan.append(("/".join(route), per_level))
+                route.append(f"lv{level:02d}")
+    elif layout == "many_small":
+        per_dirc = 5000
+        for i in range(max(files // per_dirc, 1)):
+            plan.append((f"bucket_{i:03d}", min(per_dirc, files)))
+    else:
+        stack = [("", 0)]
+        total = 0
+        while total < files:
+            if not stack:
+                stack.append((f"part_{len(plan):05d}", 1))
+            path, depth = stack.pop()
+            count = rand.randint(0, 40)
+            plan.append((path, count))
+            total += count
+            if depth < 6:
+                for j in rand.sample(range(100), rand.randint(0, 4)):
+                    name = rand.choice(("set", "spk", "cache", "sub", ".git"))
+                    stack.append((f"{path}/{name}_{j:02d}".lstrip("/"), depth + 1))
+
+    number = {"files": 0}
+    for path, count in plan:
+        dirc_path = os.path.join(root, path)
+        os.makedirs(dirc_path, exist_ok=True)
+        if layout == "mixed":
+            names = [
+                f"{rand.choice(('utt', 'spk', 'noise'))}_{i:05d}.{rand.choice(EXTENTIONS)}"
+                for i in range(count)
+            ]
+        else:
+            names = [
+                f"utt_{i:05d}.{EXTENTIONS[i % len(EXTENTIONS)]}" for i in range(count)
+            ]
+        _write_files(dirc_path, names, file_size)
+        number["files"] += count
+
+    number["dircs"] = sum(len(dircs) for _, dircs, _ in os.walk(root)) + 1
+
+    return number
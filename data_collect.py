@@ -1,73 +1,464 @@
 """Database file path collector"""
 
+import asyncio
+import functools
+import itertools
 import os
-from typing import List
-
-from material.directory import Condition, Directory
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, List, Tuple
+
+from material.directory import (
+    Condition,
+    ConditionContext,
+    Directory,
+    compile_conditions,
+)
+from material.compact import CompactTree
+from material.hashing import HashResult, hash_files
+from material.join import JoinReport, file_stem, join_files
+from material.manifest import write_manifest
+from material.memo import QueryCache, conditions_fingerprint, copy_nested
+from material.snapshot import load_snapshot, save_snapshot
+from material.stats import WalkStats, phase
+from material.walker import aiter_walk, iter_walk, scan_dirc
+from material.watch import Watcher
 
 
 class Collector:
     """Database file path collector"""
 
     def __init__(
-        self, conditions: List[Condition], root_path: str, abspath: bool = False
+        self,
+        conditions: List[Condition],
+        root_path: str,
+        abspath: bool = False,
+        workers: int = 1,
+        snapshot: str = None,
+        lazy: bool = False,
+        prune: bool = False,
+        compact: bool = False,
+        processes: int = 1,
+        stats: WalkStats = None,
+        cache_size: int = 0,
     ):
+        """
+        Args:
+            conditions (List[Condition]): Conditions of the files to be collected.
+            root_path (str): Root path of the target database.
+            abspath (bool, optional): Use absolute paths. Defaults to False.
+            workers (int, optional): Number of threads listing directories. Defaults to 1.
+            snapshot (str, optional): Snapshot file path. When the file exists, the
+                structure is loaded from it & only stale directories are rescanned.
+                The snapshot is (re)written when something was scanned. Defaults to None.
+            lazy (bool, optional): Build the Directory structure on first use instead of
+                here. iter_path() never builds it. Defaults to False.
+            prune (bool, optional): Do not list directories which every condition excludes
+                (add_exclude_dirc, add_exclude_dirc_glob). They are kept as empty members with pruned=True, so
+                the matched files are unchanged but the structure does not hold their
+                contents.
+                Defaults to False.
+            compact (bool, optional): Hold the structure in a CompactTree (flat arrays &
+                interned names) & use read-only CompactDirectory views as 'database'.
+                Defaults to False.
+            processes (int, optional): Number of processes listing the top-level
+                subtrees of 'root_path' when the structure is built from scratch.
+                'workers' is not used then. Defaults to 1.
+            stats (WalkStats|bool, optional): Record counters, phase timings & the
+                slowest directories into this WalkStats ('True' makes a new one),
+                available as 'stats'. Defaults to None.
+            cache_size (int, optional): Number of get_path() results kept in an LRU
+                cache, as 'query_cache'. Results are keyed by the contents of the
+                conditions & dropped when the structure changes; condition functions
+                must not depend on anything else. Defaults to 0 (no cache).
+        """
         if not isinstance(conditions, list):
             conditions = [conditions]
 
         if abspath:
             root_path = os.path.abspath(root_path)
 
-        self.database = Directory(root_path).build_structure()
+        self.root_path = root_path
+        self.workers = workers
+        self.processes = processes
+        self.snapshot = snapshot
+        self.prune = prune
+        self.compact = compact
         self.condition = conditions
-
-    def get_path(self, serialize: bool = False) -> list:
+        self.stats = WalkStats() if stats is True else stats or None
+        self.query_cache = QueryCache(cache_size) if cache_size > 0 else None
+
+        self._database = None
+        if not lazy:
+            self._database = self.build_database()
+
+    @property
+    def database(self) -> Directory:
+        """Directory instance of the target database, built on first access."""
+        if self._database is None:
+            self._database = self.build_database()
+        return self._database
+
+    @database.setter
+    def database(self, database: Directory) -> None:
+        self._database = database
+
+    def build_database(self) -> Directory:
+        """Build Directory structure of 'root_path' (through the snapshot if specified)."""
+
+        conditions = compile_conditions(self.condition)
+        prune = None
+        if self.prune and conditions is not None:
+            prune = conditions.dirc_pruner
+        # metadata rules are answered from metadata captured by the walk
+        metadata = conditions is not None and conditions.uses_metadata()
+
+        stats = self.stats
+
+        if self.compact and self.snapshot is None:
+            with phase(stats, "walk"):
+                tree = CompactTree.build(
+                    self.root_path,
+                    workers=self.workers,
+                    prune=prune,
+                    processes=self.processes,
+                    stats=stats,
+                    metadata=metadata,
+                )
+            return tree.root()
+
+        database = None
+        if self.snapshot is not None:
+            with phase(stats, "snapshot_load"):
+                database = load_snapshot(self.snapshot, self.root_path)
+        if database is None:
+            with phase(stats, "walk"):
+                database = Directory(self.root_path).build_structure(
+                    workers=self.workers,
+                    prune=prune,
+                    processes=self.processes,
+                    stats=stats,
+                    metadata=metadata,
+                )
+            stale = True
+        else:
+            # without pruning, pruned directories of the snapshot have to be listed
+            with phase(stats, "refresh"):
+                report = database.refresh(
+                    workers=self.workers,
+                    prune=prune or (lambda _: False),
+                    stats=stats,
+                    metadata=metadata,
+                )
+            stale = report.rescanned_dircs != []
+        if self.snapshot is not None and stale:
+            with phase(stats, "snapshot_save"):
+                save_snapshot(database, self.snapshot)
+
+        if self.compact:
+            with phase(stats, "compact"):
+                return CompactTree.from_directory(database).root()
+        return database
+
+    def get_path(
+        self,
+        serialize: bool = False,
+        grouped: bool = False,
+        rank: int = None,
+        world_size: int = None,
+    ) -> list:
         """
         Get the path to the file matching the condition &
         The directory structure is returned intact.
-        """
+        With 'grouped', the paths are grouped by directory as group_dir_file() does.
 
-        return self.database.get_file_path(self.condition, serialize=serialize)
+        With 'rank' & 'world_size', only the share of 'rank' is returned as a flat list.
+        Matching files are ordered by name (directory by directory) & dealt out
+        round-robin, so every rank gets a disjoint share differing by at most one
+        file, whatever the listing order of the filesystem is.
+
+        With 'cache_size', repeated queries return a copy of the cached result.
+        """
+        database = self.database
+        cache = self.query_cache
+        if cache is None:
+            return self.query_path(database, serialize, grouped, rank, world_size)
+
+        key = (
+            conditions_fingerprint(self.condition),
+            serialize,
+            grouped,
+            rank,
+            world_size,
+        )
+        result = cache.get(key, database)
+        if result is None:
+            version = database.version
+            result = self.query_path(database, serialize, grouped, rank, world_size)
+            cache.put(key, database, version, result)
+        return copy_nested(result)
+
+    def query_path(
+        self,
+        database: Directory,
+        serialize: bool,
+        grouped: bool,
+        rank: int,
+        world_size: int,
+    ) -> list:
+        """Evaluate get_path() on 'database' without the cache."""
+        conditions = compile_conditions(self.condition)
+        stats = self.stats
+        with phase(stats, "query"):
+            if rank is not None or world_size is not None:
+                if rank is None or world_size is None or not 0 <= rank < world_size:
+                    raise ValueError(
+                        f"'rank' must be in [0, world_size), but got {rank} & {world_size}."
+                    )
+                paths = database.iter_file_path(conditions, sort=True, stats=stats)
+                return list(itertools.islice(paths, rank, None, world_size))
+            if grouped:
+                return list(database.iter_grouped_file_path(conditions, stats=stats))
+            return database.get_file_path(conditions, serialize=serialize, stats=stats)
+
+    def iter_path(self, conditions: List[Condition] = None) -> Iterator[str]:
+        """
+        Walk the filesystem lazily & yield the path to the file matching the condition
+        as soon as it is found. The Directory structure is neither used nor built.
+        Paths come in the same order as get_path(serialize=True).
+        Directories excluded by every condition are never entered.
+        """
+        if conditions is None:
+            conditions = self.condition
+        conditions = compile_conditions(conditions)
+        if conditions is None:
+            raise TypeError("'conditions' must be specified.")
+
+        stats = self.stats
+        scanner = scan_dirc if stats is None else stats.timed(scan_dirc)
+        root_path = Directory(self.root_path, empty=True).path
+        walker = iter_walk(root_path, scanner=scanner, prune=conditions.dirc_pruner)
+        for dirc_path, file_names, dirc_names in walker:
+            if stats is not None:
+                stats.add_condition_evals(len(file_names))
+            context = ConditionContext(terminal=dirc_names == [], stats=stats)
+            for file_name in file_names:
+                file = os.path.join(dirc_path, file_name)
+                if conditions(file, context):
+                    yield "/".join(file.split(os.sep))
 
     @staticmethod
     def serialize_path_list(file_path_struct: list):
         """Serialize get_path() return value."""
+        return list(Collector.iter_serialize_path_list(file_path_struct))
 
-        def flatten(list_struct: list):
-            flatten_list = []
-            for element in list_struct:
+    @staticmethod
+    def iter_serialize_path_list(file_path_struct: list) -> Iterator[str]:
+        """Yield the paths of get_path() return value one by one."""
+        stack = [iter(file_path_struct)]
+        while stack:
+            for element in stack[-1]:
                 if isinstance(element, (list, tuple)):
-                    flatten_list += flatten(element)
-                else:
-                    flatten_list.append(element)
-
-            return flatten_list
-
-        serialized_list = flatten(file_path_struct)
-
-        return serialized_list
+                    stack.append(iter(element))
+                    break
+                yield element
+            else:
+                stack.pop()
 
     @staticmethod
     def group_dir_file(file_path_struct: list):
         """Grouping get_path() return value with same directory site."""
+        return list(Collector.iter_group_dir_file(file_path_struct))
 
-        def grouping(list_struct: list):
-            group_list = []
+    @staticmethod
+    def iter_group_dir_file(file_path_struct: list) -> Iterator[list]:
+        """Yield the groups of get_path() return value with same directory site."""
+        stack = [file_path_struct]
+        while stack:
+            list_struct = stack.pop()
             files = []
+            sub_lists = []
             for element in list_struct:
                 if isinstance(element, (list, tuple)):
-                    group_list += grouping(element)
+                    sub_lists.append(element)
                 else:
                     files.append(element)
 
             if files != []:
-                group_list = [files, *group_list]
-
-            return group_list
-
-        grouped_list = grouping(file_path_struct)
-
-        return grouped_list
+                yield files
+            stack += reversed(sub_lists)
+
+    def join_path(
+        self,
+        conditions: Dict[str, Condition],
+        key: Callable[[str], Hashable] = file_stem,
+        report: JoinReport = None,
+    ) -> Iterator[Tuple[Hashable, Dict[str, str]]]:
+        """
+        Pair related files across the whole structure, e.g. audio, transcript & features
+        sharing a stem in different subtrees. Every role of 'conditions' takes one file
+        per group & a group is yielded as soon as it is complete.
+
+        Args:
+            conditions (Dict[str, Condition]): Condition(s) of each role, by role name.
+            key (Callable[[str], Hashable], optional): Group key of a path.
+                Defaults to the file name without its extension.
+            report (JoinReport, optional): Receives the incomplete groups & duplicated
+                files once the iteration is over. Defaults to None.
+
+        Yields:
+            Tuple[Hashable, Dict[str, str]]: (key, {role: path}) of every complete group.
+        """
+        if not isinstance(conditions, dict):
+            raise TypeError("'conditions' must be a dict of {role: conditions}.")
+
+        compiled = {}
+        for role, condition in conditions.items():
+            compiled[role] = compile_conditions(condition)
+            if compiled[role] is None:
+                raise TypeError(f"Condition of role '{role}' must be specified.")
+
+        return join_files(self.database, compiled, key, report, self.stats)
+
+    def hash_files(
+        self,
+        algorithm: str = "sha256",
+        workers: int = None,
+        cache: str = None,
+        progress: Callable[[int, int], Any] = None,
+    ) -> HashResult:
+        """Hash the contents of the files matching the condition.
+
+        Args:
+            algorithm (str, optional): hashlib algorithm name. Defaults to "sha256".
+            workers (int, optional): Number of reading threads. Defaults to max('workers', 4).
+            cache (str, optional): Hash cache file. Files whose (device, inode, size, mtime)
+                is in the cache are not read again. Defaults to None.
+            progress (Callable[[int, int], Any], optional): Called as progress(done, total)
+                after every read file.
+
+        Returns:
+            HashResult: Digests by path, with duplicates() & write_manifest().
+        """
+        if workers is None:
+            workers = max(self.workers, 4)
+        return hash_files(
+            self.get_path(serialize=True),
+            algorithm=algorithm,
+            workers=workers,
+            cache_path=cache,
+            progress=progress,
+        )
+
+    def watch(
+        self,
+        callback: Callable[[str], Any],
+        on_remove: Callable[[str], Any] = None,
+        poll_interval: float = 1.0,
+        backend: str = "auto",
+        on_error: Callable[[Exception], Any] = None,
+    ) -> Watcher:
+        """Keep 'database' in sync with the filesystem & report files matching the condition.
+
+        Changes are applied to the affected Directory instances only (inotify on
+        Linux, periodic refresh() elsewhere). The watcher is started already; use
+        it as a context manager or call stop(). Hold its 'lock' while querying
+        from other threads.
+
+        Args:
+            callback (Callable[[str], Any]): Called with every new matching file.
+            on_remove (Callable[[str], Any], optional): Called with every removed
+                matching file. Defaults to None.
+            poll_interval (float, optional): Seconds between refreshes when polling.
+                Defaults to 1.0.
+            backend (str, optional): "auto", "inotify" or "poll". Defaults to "auto".
+            on_error (Callable[[Exception], Any], optional): Called with every failed
+                refresh, which is retried after 'poll_interval', & with every exception
+                of a callback. Defaults to None.
+
+        Returns:
+            Watcher: The started watcher.
+        """
+        conditions = compile_conditions(self.condition)
+        prune = None
+        if self.prune and conditions is not None:
+            prune = conditions.dirc_pruner
+        watcher = Watcher(
+            self.database,
+            self.condition,
+            callback,
+            on_remove=on_remove,
+            poll_interval=poll_interval,
+            prune=prune,
+            backend=backend,
+            on_error=on_error,
+        )
+        return watcher.start()
+
+    def export_manifest(
+        self, manifest_path: str, dircs: bool = False, sizes: bool = False
+    ) -> int:
+        """Write the files matching the condition as a binary manifest for Manifest.
+
+        Paths are ordered by name (directory by directory) as in get_path(rank=...),
+        so the indices do not depend on the listing order of the filesystem.
+        Data loader workers can share one memory-mapped Manifest instead of
+        holding (& pickling) their own copy of the path list.
+
+        Args:
+            manifest_path (str): Output manifest file path.
+            dircs (bool, optional): Store directory ids & paths. Defaults to False.
+            sizes (bool, optional): Store file sizes. Sizes captured by the walk
+                (file_meta) are used as they are, the other files are stat'ed on
+                'workers' threads. Defaults to False.
+
+        Returns:
+            int: Number of written paths.
+        """
+        conditions = compile_conditions(self.condition)
+        stats = self.stats
+        with phase(stats, "query"):
+            paths = list(
+                self.database.iter_file_path(conditions, sort=True, stats=stats)
+            )
+
+        file_sizes = None
+        if sizes:
+            file_sizes = self.get_file_sizes(paths)
+
+        return write_manifest(manifest_path, paths, dircs=dircs, sizes=file_sizes)
+
+    def get_file_sizes(self, paths: List[str]) -> List[int]:
+        """Sizes of 'paths' (as collected), from the file metadata captured by the
+        last listing of their directory. Only the other files are stat'ed, on
+        'workers' threads."""
+        file_meta = {}
+        stack = [self.database]
+        while stack:
+            dirc = stack.pop()
+            if dirc.file_meta is not None:
+                file_meta["/".join(dirc.path.split(os.sep))] = dirc.file_meta
+            stack += dirc.dirc_member
+
+        file_sizes = []
+        misses = []
+        for index, path in enumerate(paths):
+            dirc_path, _, name = path.rpartition("/")
+            meta = file_meta.get(dirc_path, {}).get(name)
+            if meta is None:
+                misses.append(index)
+                file_sizes.append(0)
+            else:
+                file_sizes.append(meta.size)
+
+        if misses:
+            if self.stats is not None:
+                self.stats.add_fs_calls(len(misses))
+            with ThreadPoolExecutor(max_workers=max(self.workers, 1)) as executor:
+                stated = executor.map(os.path.getsize, [paths[i] for i in misses])
+                for index, size in zip(misses, stated):
+                    file_sizes[index] = size
+
+        return file_sizes
 
     def get_directory_instance(self) -> Directory:
         """Return Directory instance which used this Collector"""
@@ -83,14 +474,125 @@ class Collector:
 
     def __str__(self):
         out_str = ""
-        struct_path = self.get_path()
-
-        for file_path in self.serialize_path_list(struct_path):
+        for file_path in self.get_path(serialize=True):
             out_str += f"collect path: {file_path}\n"
 
         return out_str
 
 
+class AsyncCollector(Collector):
+    """asyncio counterpart of Collector.
+
+    Create it with 'await AsyncCollector.create(...)'. Directory listings are
+    dispatched to threads, at most 'concurrency' at a time, so the event loop
+    stays responsive during the walk.
+    """
+
+    def __init__(
+        self,
+        conditions: List[Condition],
+        root_path: str,
+        abspath: bool = False,
+        concurrency: int = 16,
+        **kwargs,
+    ):
+        """
+        Args:
+            conditions (List[Condition]): Conditions of the files to be collected.
+            root_path (str): Root path of the target database.
+            abspath (bool, optional): Use absolute paths. Defaults to False.
+            concurrency (int, optional): Maximum number of directory listings in flight.
+                Defaults to 16.
+            **kwargs: Other keyword arguments of Collector ('lazy' is always set).
+        """
+        kwargs["lazy"] = True
+        kwargs.setdefault("workers", concurrency)
+        super().__init__(conditions, root_path, abspath=abspath, **kwargs)
+        self.concurrency = concurrency
+
+    @classmethod
+    async def create(
+        cls,
+        conditions: List[Condition],
+        root_path: str,
+        abspath: bool = False,
+        concurrency: int = 16,
+        **kwargs,
+    ) -> "AsyncCollector":
+        """Create an AsyncCollector & build its Directory structure.
+        Pass lazy=True to skip building, e.g. when only aiter_path() is used."""
+        lazy = kwargs.pop("lazy", False)
+        collector = cls(conditions, root_path, abspath, concurrency, **kwargs)
+        if not lazy:
+            collector.database = await collector.abuild_database()
+        return collector
+
+    async def abuild_database(self) -> Directory:
+        """Coroutine version of build_database().
+        With a snapshot or a compact structure, build_database() runs in a thread."""
+
+        if self.snapshot is not None or self.compact or self.processes > 1:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.build_database)
+
+        conditions = compile_conditions(self.condition)
+        prune = None
+        if self.prune and conditions is not None:
+            prune = conditions.dirc_pruner
+
+        with phase(self.stats, "walk"):
+            return await Directory(self.root_path).abuild_structure(
+                concurrency=self.concurrency,
+                prune=prune,
+                stats=self.stats,
+                metadata=conditions is not None and conditions.uses_metadata(),
+            )
+
+    async def aget_path(self, **kwargs) -> list:
+        """Run get_path() in a thread. Takes the same keyword arguments."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.get_path, **kwargs)
+        )
+
+    async def aiter_path(
+        self, conditions: List[Condition] = None
+    ) -> AsyncIterator[str]:
+        """
+        Walk the filesystem concurrently & yield the path to the file matching the condition
+        as soon as its directory is listed. The Directory structure is neither used nor built.
+        Directories come in completion order, files of one directory stay together.
+        Directories excluded by every condition are never entered.
+        """
+        if conditions is None:
+            conditions = self.condition
+        conditions = compile_conditions(conditions)
+        if conditions is None:
+            raise TypeError("'conditions' must be specified.")
+        prune = conditions.dirc_pruner
+
+        def visit(dirc_path: str, listing: tuple):
+            children = []
+            for dirc_name in listing[1]:
+                child_path = os.path.join(dirc_path, dirc_name)
+                if not prune(dirc_name, child_path):
+                    children.append((child_path, child_path))
+            return children
+
+        stats = self.stats
+        scanner = scan_dirc if stats is None else stats.timed(scan_dirc)
+        root_path = Directory(self.root_path, empty=True).path
+        walker = aiter_walk(root_path, root_path, visit, self.concurrency, scanner)
+        async for dirc_path, (file_names, dirc_names, _) in walker:
+            if stats is not None:
+                stats.add_condition_evals(len(file_names))
+            context = ConditionContext(terminal=dirc_names == [], stats=stats)
+            for file_name in file_names:
+                file = os.path.join(dirc_path, file_name)
+                if conditions(file, context):
+                    yield "/".join(file.split(os.sep))
+
+
 if __name__ == "__main__":
     # example1
     cond = Condition()
@@ -1,3 +1,17 @@
 """__init__.py"""
 
-from .directory import Directory, Condition
+from .directory import (
+    Directory,
+    Condition,
+    ConditionContext,
+    ChangeReport,
+    CompiledCondition,
+    compile_conditions,
+    PathIndex,
+)
+from .snapshot import save_snapshot, load_snapshot
+from .compact import CompactTree, CompactDirectory
+from .stats import WalkStats
+from .join import JoinReport
+from .manifest import Manifest, write_manifest
+from .watch import Watcher
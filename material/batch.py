@@ -0,0 +1,189 @@
+"""Batch evaluation of Condition over path arrays for database collector"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, List, Sequence, Tuple
+
+from .metadata import build_meta_check
+from .pattern import NameMatcher, PathMatcher
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Directory uses batch evaluation when it holds at least this many files.
+BATCH_THRESHOLD = 1024
+
+# vectorized string operations need NumPy >= 2 (StringDType & numpy.strings)
+VECTORIZED = (
+    np is not None
+    and hasattr(np, "dtypes")
+    and hasattr(np.dtypes, "StringDType")
+    and hasattr(getattr(np, "strings", None), "rpartition")
+)
+
+
+def _split_columns(paths: List[str]) -> Tuple[Any, Any, Any]:
+    """Split normalized paths into (dirname, basename, extention) columns."""
+    string = np.dtypes.StringDType()
+    heads, seps, names = np.strings.rpartition(
+        np.array(paths, dtype=string), np.array(os.sep, dtype=string)
+    )
+    heads = np.where((heads == "") & (seps != ""), os.sep, heads)
+    bases, dots, exts = np.strings.rpartition(names, np.array(".", dtype=string))
+    exts = np.where((dots != "") & (np.strings.lstrip(bases, ".") != ""), exts, "")
+
+    return heads, names, exts
+
+
+def _split_ext(name: str) -> str:
+    base, dot, ext = name.rpartition(".")
+    if dot and base.lstrip("."):
+        return ext
+    return ""
+
+
+def build_batch_predicate(condition: Any) -> Callable[..., List[int]]:
+    """Build the batch predicate of one Condition.
+
+    The returned function takes a list of paths (& optionally the
+    ConditionContext of the directory holding all of them) & returns the
+    indices of the matching ones. Built-in rules are evaluated column by column (vectorized
+    when NumPy >= 2 is installed), path patterns & metadata rules are checked on the surviving
+    rows & 'condition_func' callbacks only see the rows surviving every other rule.
+    """
+
+    only_terminal_file = condition.only_terminal_file
+    contain_dirc = NameMatcher(condition.contain_dirc, condition.contain_dirc_glob)
+    exclude_dirc = NameMatcher(condition.exclude_dirc, condition.exclude_dirc_glob)
+    extention = frozenset(condition.extention)
+    exclude_extention = frozenset(condition.exclude_extention)
+    contain_literal = list(condition.contain_literal)
+    exclude_literal = list(condition.exclude_literal)
+    path_matcher = None
+    if condition.path_glob or condition.path_regex:
+        path_matcher = PathMatcher(condition.path_glob, condition.path_regex)
+    meta_check = build_meta_check(condition)
+    condition_func = tuple(condition.condition_func)
+
+    sep = os.sep
+    altsep = "/" if sep == "\\" else "\\"
+
+    def check_dirc(dirs_path: str, context: Any) -> bool:
+        dircs = dirs_path.split(sep)
+        if contain_dirc and not contain_dirc.match_any(dircs):
+            return False
+        if exclude_dirc and exclude_dirc.match_any(dircs):
+            return False
+        if only_terminal_file:
+            if context is not None:
+                return context.terminal
+            for mem in os.listdir(dirs_path):
+                if os.path.isdir(os.path.join(dirs_path, mem)):
+                    return False
+        return True
+
+    def vectorized_rows(paths: List[str], context: Any) -> List[int]:
+        heads, names, exts = _split_columns(paths)
+        string = np.dtypes.StringDType()
+        mask = np.ones(len(paths), dtype=bool)
+
+        if extention:
+            mask &= np.isin(exts, np.array(list(extention), dtype=string))
+        if exclude_extention:
+            mask &= ~np.isin(exts, np.array(list(exclude_extention), dtype=string))
+
+        if contain_literal:
+            contained = np.zeros(len(paths), dtype=bool)
+            for literal in contain_literal:
+                contained |= np.strings.find(names, literal) >= 0
+            mask &= contained
+        for literal in exclude_literal:
+            mask &= np.strings.find(names, literal) < 0
+
+        if contain_dirc or exclude_dirc or only_terminal_file:
+            # files of one directory share the result, evaluate each directory once
+            dircs, inverse = np.unique(heads[mask], return_inverse=True)
+            dirc_mask = np.array(
+                [check_dirc(str(dirc), context) for dirc in dircs], dtype=bool
+            )
+            mask[mask] = dirc_mask[inverse.reshape(-1)]
+
+        return np.flatnonzero(mask).tolist()
+
+    def python_rows(paths: List[str], context: Any) -> List[int]:
+        splitted = [path.rpartition(sep) for path in paths]
+        rows = range(len(paths))
+
+        if extention or exclude_extention:
+            exts = [_split_ext(splitted[row][2]) for row in rows]
+            rows = [
+                row
+                for row, ext in zip(rows, exts)
+                if (not extention or ext in extention) and ext not in exclude_extention
+            ]
+
+        if contain_literal:
+            rows = [
+                row
+                for row in rows
+                if any(literal in splitted[row][2] for literal in contain_literal)
+            ]
+        if exclude_literal:
+            rows = [
+                row
+                for row in rows
+                if not any(literal in splitted[row][2] for literal in exclude_literal)
+            ]
+
+        if contain_dirc or exclude_dirc or only_terminal_file:
+            # files of one directory share the result, evaluate each directory once
+            dirc_result = {}
+            selected = []
+            for row in rows:
+                head, seps, _ = splitted[row]
+                if head == "" and seps != "":
+                    head = sep
+                if head not in dirc_result:
+                    dirc_result[head] = check_dirc(head, context)
+                if dirc_result[head]:
+                    selected.append(row)
+            rows = selected
+
+        return list(rows)
+
+    def batch_predicate(paths: List[str], context: Any = None) -> List[int]:
+        given_paths = paths
+        paths = [path.replace(altsep, sep) for path in paths]
+        if VECTORIZED:
+            rows = vectorized_rows(paths, context)
+        else:
+            rows = python_rows(paths, context)
+
+        if path_matcher is not None:
+            rows = [row for row in rows if path_matcher.match(paths[row])]
+        if meta_check is not None:
+            rows = [row for row in rows if meta_check(given_paths[row], context)]
+        if condition_func:
+            rows = [
+                row for row in rows if all(func(paths[row]) for func in condition_func)
+            ]
+
+        return rows
+
+    return batch_predicate
+
+
+def to_mask(rows: List[int], length: int) -> Sequence[bool]:
+    """Convert matching row indices into a boolean mask of 'length'."""
+    if np is not None:
+        mask = np.zeros(length, dtype=bool)
+        mask[rows] = True
+        return mask
+
+    mask = [False] * length
+    for row in rows:
+        mask[row] = True
+    return mask
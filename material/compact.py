@@ -0,0 +1,361 @@
+"""Compact columnar Directory structure for database collector"""
+
+from __future__ import annotations
+
+import os
+from array import array
+from typing import Callable, Dict, List, Tuple
+
+from .directory import Directory
+from .metadata import FileMeta
+from .pattern import prune_dirc
+from .stats import WalkStats
+from .walker import scan_dirc, scan_dirc_meta, shard_walk, walk
+
+
+class StringTable:
+    """Interned strings stored once in one UTF-8 blob."""
+
+    def __init__(self) -> None:
+        self.blob = bytearray()
+        self.offsets = array("Q", [0])
+        self.index = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def add(self, string: str) -> int:
+        """Intern 'string' & return its id."""
+        string_id = self.index.get(string)
+        if string_id is None:
+            string_id = len(self)
+            self.blob += string.encode("utf-8", "surrogateescape")
+            self.offsets.append(len(self.blob))
+            self.index[string] = string_id
+        return string_id
+
+    def get(self, string_id: int) -> str:
+        """Get the string of 'string_id'."""
+        start = self.offsets[string_id]
+        end = self.offsets[string_id + 1]
+        return self.blob[start:end].decode("utf-8", "surrogateescape")
+
+    def freeze(self) -> None:
+        """Drop the interning index. No more strings can be added after this."""
+        self.index = None
+
+
+class CompactTree:
+    """Directory structure stored in flat arrays.
+
+    Directories are numbered with the root as 0. Children of one directory &
+    files of one directory have consecutive numbers, so each directory only
+    keeps (start, count) pairs into the directory & file columns. Names are
+    string table ids, full paths are rebuilt on demand by CompactDirectory.
+    With 'metadata', FileMeta of the files is kept in size, mtime & symlink
+    columns; directories listed with metadata are flagged HAS_META.
+    """
+
+    TERMINAL = 1
+    PRUNED = 2
+    HAS_META = 4
+
+    def __init__(
+        self, root_path: str, empty: bool = False, metadata: bool = False
+    ) -> None:
+        self.root_template = Directory(root_path, empty)
+        self.empty = empty
+        self.metadata = metadata
+
+        self.names = StringTable()
+        self.dirc_name = array("I")
+        self.dirc_parent = array("I")
+        self.dirc_flag = bytearray()
+        self.child_start = array("I")
+        self.child_count = array("I")
+        self.file_start = array("I")
+        self.file_count = array("I")
+        self.file_name = array("I")
+        self.file_size = array("Q")
+        self.file_mtime = array("q")
+        self.file_symlink = bytearray()
+
+        self.add_dirc(self.root_template.name, 0, False)
+
+    def add_dirc(self, name: str, parent: int, pruned: bool) -> int:
+        """Append one not listed directory & return its id."""
+        dirc_id = len(self.dirc_name)
+        self.dirc_name.append(self.names.add(name))
+        self.dirc_parent.append(parent)
+        self.dirc_flag.append(self.TERMINAL | (self.PRUNED if pruned else 0))
+        self.child_start.append(0)
+        self.child_count.append(0)
+        self.file_start.append(0)
+        self.file_count.append(0)
+        return dirc_id
+
+    def set_member(
+        self,
+        dirc_id: int,
+        file_names: List[str],
+        dirc_names: List[str],
+        prune: Callable[[str], bool] = None,
+        path: str = None,
+        file_meta: Dict[str, FileMeta] = None,
+    ) -> List[int]:
+        """Set members of 'dirc_id' from one listing & return child ids to be listed.
+        'path' of the directory is required with 'prune'. 'file_meta' is kept
+        when this tree holds metadata & it covers every file."""
+        if not self.empty:
+            self.file_start[dirc_id] = len(self.file_name)
+            self.file_count[dirc_id] = len(file_names)
+            self.file_name.extend(self.names.add(name) for name in file_names)
+            if self.metadata:
+                metas = [None] * len(file_names)
+                if file_meta is not None:
+                    metas = [file_meta.get(name) for name in file_names]
+                if None not in metas:
+                    self.dirc_flag[dirc_id] |= self.HAS_META
+                    self.file_size.extend(meta.size for meta in metas)
+                    self.file_mtime.extend(meta.mtime_ns for meta in metas)
+                    self.file_symlink.extend(meta.symlink for meta in metas)
+                else:
+                    self.file_size.extend(0 for _ in metas)
+                    self.file_mtime.extend(0 for _ in metas)
+                    self.file_symlink.extend(0 for _ in metas)
+
+        self.child_start[dirc_id] = len(self.dirc_name)
+        self.child_count[dirc_id] = len(dirc_names)
+        if dirc_names:
+            self.dirc_flag[dirc_id] &= ~self.TERMINAL
+
+        children = []
+        for name in dirc_names:
+            pruned = prune is not None and prune_dirc(prune, os.path.join(path, name))
+            child_id = self.add_dirc(name, dirc_id, pruned)
+            if not pruned:
+                children.append(child_id)
+
+        return children
+
+    @classmethod
+    def build(
+        cls,
+        root_path: str,
+        empty: bool = False,
+        workers: int = 1,
+        prune: Callable[[str], bool] = None,
+        processes: int = 1,
+        stats: WalkStats = None,
+        metadata: bool = False,
+    ) -> CompactTree:
+        """Walk 'root_path' & build the compact structure.
+
+        Args:
+            root_path (str): Root path of the structure.
+            empty (bool, optional): Do not keep file members. Defaults to False.
+            workers (int, optional): Number of threads listing directories. Defaults to 1.
+            prune (Callable[[str], bool], optional): Directory-name predicate.
+                Matching directories are kept unlisted (pruned=True). Defaults to None.
+            processes (int, optional): Number of processes listing top-level subtrees.
+                Defaults to 1.
+            stats (WalkStats, optional): Records the listings. Defaults to None.
+            metadata (bool, optional): Capture file metadata. Defaults to False.
+        """
+        tree = cls(root_path, empty, metadata)
+
+        def visit(node: Tuple[int, str], listing: Tuple[List[str], List[str], int]):
+            dirc_id, path = node
+            file_names, dirc_names = listing[0], listing[1]
+            file_meta = listing[3] if len(listing) > 3 else None
+            if stats is not None and processes > 1:
+                stats.add_listing(path, listing)
+            children = []
+            for child in tree.set_member(
+                dirc_id, file_names, dirc_names, prune, path, file_meta
+            ):
+                child_path = os.path.join(path, tree.get_name(child))
+                children.append(((child, child_path), child_path))
+            return children
+
+        root_path = tree.root_template.path
+        scanner = scan_dirc_meta if metadata else scan_dirc
+        if processes > 1:
+            shard_walk(
+                (0, root_path), root_path, visit, processes, prune, scanner=scanner
+            )
+        else:
+            if stats is not None:
+                scanner = stats.timed(scanner)
+            walk((0, root_path), root_path, visit, workers, scanner)
+        tree.names.freeze()
+
+        return tree
+
+    @classmethod
+    def from_directory(cls, directory: Directory) -> CompactTree:
+        """Convert a Directory structure into the compact structure,
+        keeping the captured file metadata if any."""
+        metadata = False
+        stack = [directory]
+        while stack and not metadata:
+            dirc = stack.pop()
+            metadata = dirc.file_meta is not None
+            stack += dirc.dirc_member
+        tree = cls(directory.path, directory.empty, metadata)
+
+        stack = [(0, directory)]
+        while stack:
+            dirc_id, dirc = stack.pop()
+            file_names = [os.path.basename(file) for file in dirc.file_member]
+            dirc_names = [child.name for child in dirc.dirc_member]
+            tree.set_member(dirc_id, file_names, dirc_names, file_meta=dirc.file_meta)
+            start = tree.child_start[dirc_id]
+            for i, child in enumerate(dirc.dirc_member):
+                if child.pruned:
+                    tree.dirc_flag[start + i] |= cls.PRUNED
+                stack.append((start + i, child))
+        tree.names.freeze()
+
+        return tree
+
+    def get_name(self, dirc_id: int) -> str:
+        """Get the name of directory 'dirc_id'."""
+        return self.names.get(self.dirc_name[dirc_id])
+
+    def root(self) -> CompactDirectory:
+        """Get the view of the root directory."""
+        template = self.root_template
+        return CompactDirectory(self, 0, template.path, template.abspath)
+
+    def __len__(self) -> int:
+        return len(self.dirc_name)
+
+
+class CompactDirectory(Directory):
+    """Read-only Directory view of one directory in a CompactTree.
+
+    Query methods of Directory (get_file_path, get_all_instances, __call__,
+    clone, incarnate, ...) work unchanged; clone() returns a plain Directory.
+    Methods which modify the structure (or the files it lists, like
+    remove_member) raise TypeError before touching anything.
+    """
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self, tree: CompactTree, index: int, path: str, abspath: str
+    ) -> None:
+        self.tree = tree
+        self.index = index
+        self._path = path
+        self._abspath = abspath
+        self._dirc_index = None
+        self._file_names = None
+
+    @property
+    def name(self) -> str:
+        return self.tree.get_name(self.index)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def abspath(self) -> str:
+        return self._abspath
+
+    @property
+    def empty(self) -> bool:
+        return self.tree.empty
+
+    @property
+    def terminal(self) -> bool:
+        return bool(self.tree.dirc_flag[self.index] & CompactTree.TERMINAL)
+
+    @property
+    def pruned(self) -> bool:
+        return bool(self.tree.dirc_flag[self.index] & CompactTree.PRUNED)
+
+    @property
+    def mtime(self) -> None:
+        return None
+
+    @property
+    def file_meta(self) -> Dict[str, FileMeta] | None:
+        tree = self.tree
+        if not tree.dirc_flag[self.index] & CompactTree.HAS_META:
+            return None
+        start = tree.file_start[self.index]
+        return {
+            tree.names.get(tree.file_name[i]): FileMeta(
+                tree.file_size[i], tree.file_mtime[i], bool(tree.file_symlink[i])
+            )
+            for i in range(start, start + tree.file_count[self.index])
+        }
+
+    @property
+    def version(self) -> int:
+        return 0
+
+    @property
+    def file_member(self) -> List[str]:
+        tree = self.tree
+        start = tree.file_start[self.index]
+        names = tree.file_name[start : start + tree.file_count[self.index]]
+        return [os.path.join(self._path, tree.names.get(name)) for name in names]
+
+    @property
+    def _files(self) -> List[str]:
+        return self.file_member
+
+    @property
+    def dirc_member(self) -> List[CompactDirectory]:
+        tree = self.tree
+        start = tree.child_start[self.index]
+        members = []
+        for child in range(start, start + tree.child_count[self.index]):
+            name = tree.get_name(child)
+            members.append(
+                CompactDirectory(
+                    tree,
+                    child,
+                    os.path.join(self._path, name),
+                    os.path.join(self._abspath, name),
+                )
+            )
+        return members
+
+    def to_directory(self) -> Directory:
+        """Materialize this view & its subtree as a plain Directory structure."""
+        return self.clone()
+
+
+def _read_only(name: str) -> Callable:
+    def method(self, *args, **kwargs):
+        raise TypeError(
+            f"'{name}' is not supported by the read-only {type(self).__name__}. "
+            "Use to_directory() to get a modifiable Directory structure."
+        )
+
+    method.__name__ = name
+    return method
+
+
+for _name in (
+    "build_structure",
+    "update_member",
+    "set_member",
+    "refresh",
+    "patch_member",
+    "add_file",
+    "set_file_meta",
+    "remove_file",
+    "add_dirc",
+    "remove_dirc",
+    "remove_member",
+    "discard_files",
+    "own_files",
+    "share_files",
+    "destruct",
+):
+    setattr(CompactDirectory, _name, _read_only(_name))
+del _name
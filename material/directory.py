@@ -4,8 +4,43 @@ from __future__ import annotations
 
 import os
 import re
-import shutil
-from typing import Any, Callable, List, Iterable
+from typing import Any, Callable, Dict, List, Iterable, Iterator, Set, Tuple
+
+from .batch import BATCH_THRESHOLD, build_batch_predicate, to_mask
+from .memo import TreeVersion
+from .metadata import FILE_TYPES, FileMeta, build_meta_check
+from .pattern import DircPruner, NameMatcher, PathMatcher, prune_dirc
+from .stats import WalkStats
+from .transfer import (
+    REMOVE_BATCH_SIZE,
+    CopyProgress,
+    RemoveSummary,
+    remove_files,
+    transfer_files,
+)
+from .walker import async_walk, scan_dirc, scan_dirc_meta, shard_walk, walk
+
+
+class ConditionContext:
+    """Tree information given to conditions for the files of one directory.
+
+    Structural rules such as only_terminal() & metadata rules such as
+    specify_size() are answered from here instead of the filesystem.
+    'metadata' maps file names to FileMeta captured during the walk &
+    'stats' records the stat of files without it.
+    """
+
+    def __init__(
+        self,
+        directory: Directory = None,
+        terminal: bool = True,
+        metadata: Dict[str, FileMeta] = None,
+        stats: WalkStats = None,
+    ) -> None:
+        self.directory = directory
+        self.terminal = terminal
+        self.metadata = metadata
+        self.stats = stats
 
 
 class Condition:
@@ -17,82 +52,55 @@ class Condition:
         self.exclude_literal = []
         self.contain_dirc = []
         self.exclude_dirc = []
+        self.contain_dirc_glob = []
+        self.exclude_dirc_glob = []
         self.extention = []
         self.exclude_extention = []
+        self.size_range = []
+        self.mtime_range = []
+        self.file_type = []
+        self.path_glob = []
+        self.path_regex = []
         self.condition_func = []
 
-    def __call__(self, file_path: str) -> bool:
-        file_path = os.sep.join(re.split(r"[\\/]", file_path))
+        self._version = 0
+        self._fingerprint = None
+        self._predicate = None
 
-        if self.only_terminal_file:
-            dirs_path = os.path.dirname(file_path)
-            mems = os.listdir(dirs_path)
-            for mem in mems:
-                if os.path.isdir(os.path.join(dirs_path, mem)):
-                    return False
+    def __call__(self, file_path: str, context: ConditionContext = None) -> bool:
+        return self.predicate()(file_path, context)
 
-        if self.contain_dirc:
-            dircs = os.path.dirname(file_path).split(os.sep)
-            exist = False
-            for target_dirc in self.contain_dirc:
-                if target_dirc in dircs:
-                    exist = True
-                    break
-            if not exist:
-                return False
+    def predicate(self) -> Callable[..., bool]:
+        """Compiled predicate of this condition (as used by CompiledCondition),
+        rebuilt only after this condition is changed through its methods."""
+        if self._predicate is None or self._predicate[0] != self._version:
+            self._predicate = (self._version, CompiledCondition.build_predicate(self))
+        return self._predicate[1]
 
-        if self.exclude_dirc:
-            dircs = os.path.dirname(file_path).split(os.sep)
-            for target_dirc in self.exclude_dirc:
-                if target_dirc in dircs:
-                    return False
-
-        if self.extention:
-            ext = os.path.splitext(file_path)[-1][1:]
-            if not ext in self.extention:
-                return False
-
-        if self.exclude_extention:
-            ext = os.path.splitext(file_path)[-1][1:]
-            if ext in self.exclude_extention:
-                return False
-
-        if self.contain_literal:
-            exist = False
-            for literal in self.contain_literal:
-                if literal in os.path.basename(file_path):
-                    exist = True
-                    break
-            if not exist:
-                return False
-
-        if self.exclude_literal:
-            for literal in self.exclude_literal:
-                if literal in os.path.basename(file_path):
-                    return False
-
-        if self.condition_func:
-            for condition in self.condition_func:
-                if not condition(file_path):
-                    return False
-
-        return True
+    def __getstate__(self) -> dict:
+        # the compiled predicate is a closure, rebuilt after unpickling
+        state = vars(self).copy()
+        state["_predicate"] = None
+        return state
 
     def only_terminal(self, set_status: bool = True) -> Condition:
         """set condition, get file path only terminal files"""
         self.only_terminal_file = set_status
+        self._version += 1
 
         return self
 
     def add_contain_filename(self, literal: List[str]) -> Condition:
         """set condition, get file path which include literal"""
         self.contain_literal += literal
+        self._version += 1
 
         return self
 
     def add_exclude_filename(self, literal: List[str]) -> Condition:
         """set condition, get file path which exclude literal"""
         self.exclude_literal += literal
+        self._version += 1
 
         return self
 
@@ -104,6 +112,7 @@ class Condition:
                 continue
             new_list.append(c_l)
         self.contain_literal = new_list
+        self._version += 1
 
         return self
 
@@ -115,18 +124,21 @@ class Condition:
                 continue
             new_list.append(c_l)
         self.exclude_literal = new_list
+        self._version += 1
 
         return self
 
     def add_contain_dirc(self, dirc_name: List[str]) -> Condition:
         """set condition, get file path which include 'dirc_name'"""
         self.contain_dirc += dirc_name
+        self._version += 1
 
         return self
 
     def add_exclude_dirc(self, dirc_name: List[str]) -> Condition:
         """set condition, get file path which exclude 'dirc_name'"""
         self.exclude_dirc += dirc_name
+        self._version += 1
 
         return self
 
@@ -138,6 +150,7 @@ class Condition:
                 continue
             new_list.append(c_l)
         self.contain_dirc = new_list
+        self._version += 1
 
         return self
 
@@ -149,18 +162,51 @@ class Condition:
                 continue
             new_list.append(c_l)
         self.exclude_dirc = new_list
+        self._version += 1
+
+        return self
+
+    def add_contain_dirc_glob(self, pattern: List[str]) -> Condition:
+        """set condition, get file path which include a directory matching a
+        glob-style 'pattern' (e.g. 'train*')"""
+        self.contain_dirc_glob += pattern
+        self._version += 1
+
+        return self
+
+    def add_exclude_dirc_glob(self, pattern: List[str]) -> Condition:
+        """set condition, get file path which exclude the directories matching a
+        glob-style 'pattern' (e.g. 'cache*')"""
+        self.exclude_dirc_glob += pattern
+        self._version += 1
+
+        return self
+
+    def remove_contain_dirc_glob(self, pattern: List[str]) -> Condition:
+        """remove directory-name patterns in registered patterns"""
+        self.contain_dirc_glob = [p for p in self.contain_dirc_glob if p not in pattern]
+        self._version += 1
+
+        return self
+
+    def remove_exclude_dirc_glob(self, pattern: List[str]) -> Condition:
+        """remove excluded directory-name patterns in registered patterns"""
+        self.exclude_dirc_glob = [p for p in self.exclude_dirc_glob if p not in pattern]
+        self._version += 1
 
         return self
 
     def specify_extention(self, extention: List[str]) -> Condition:
         """Specify the file extension."""
         self.extention += extention
+        self._version += 1
 
         return self
 
     def specify_exclude_extention(self, extention: List[str]) -> Condition:
         """Exclude the file extension."""
         self.exclude_extention += extention
+        self._version += 1
 
         return self
 
@@ -172,6 +218,78 @@ class Condition:
                 continue
             new_list.append(c_l)
         self.extention = new_list
+        self._version += 1
+
+        return self
+
+    def specify_size(self, min_size: int = None, max_size: int = None) -> Condition:
+        """Specify the range of the file size in bytes (both ends included, None: no limit)."""
+        self.size_range = [min_size, max_size]
+        self._version += 1
+
+        return self
+
+    def specify_mtime(
+        self, newer_than: float = None, older_than: float = None
+    ) -> Condition:
+        """Specify the range of the file modification time as UNIX time in seconds
+        (e.g. newer_than=time.time() - 86400 for the files modified in the last day)."""
+        self.mtime_range = [newer_than, older_than]
+        self._version += 1
+
+        return self
+
+    def specify_file_type(self, file_type: List[str]) -> Condition:
+        """Specify the file type, "regular" and/or "symlink"."""
+        for name in file_type:
+            if name not in FILE_TYPES:
+                raise ValueError(
+                    f"'file_type' must be in {FILE_TYPES}, but got '{name}'."
+                )
+        self.file_type += file_type
+        self._version += 1
+
+        return self
+
+    def uses_metadata(self) -> bool:
+        """Whether size, mtime or file type rules are set."""
+        return (
+            any(value is not None for value in self.size_range)
+            or any(value is not None for value in self.mtime_range)
+            or self.file_type != []
+        )
+
+    def add_glob(self, pattern: List[str]) -> Condition:
+        """set condition, get file path which matches a glob path pattern
+        (e.g. 'data/**/train/*/audio/*.wav' for the root path 'data').
+        Patterns match the whole path, '**' matches any number of directories."""
+        PathMatcher(pattern)
+        self.path_glob += pattern
+        self._version += 1
+
+        return self
+
+    def add_regex(self, pattern: List[str]) -> Condition:
+        """set condition, get file path which matches a regex path pattern.
+        '/' separates regexes matching one whole path component each
+        (e.g. 'data/**/spk\\d+/.*\\.wav'), '**' matches any number of directories."""
+        PathMatcher(regexes=pattern)
+        self.path_regex += pattern
+        self._version += 1
+
+        return self
+
+    def remove_glob(self, pattern: List[str]) -> Condition:
+        """remove glob path patterns in registered patterns"""
+        self.path_glob = [p for p in self.path_glob if p not in pattern]
+        self._version += 1
+
+        return self
+
+    def remove_regex(self, pattern: List[str]) -> Condition:
+        """remove regex path patterns in registered patterns"""
+        self.path_regex = [p for p in self.path_regex if p not in pattern]
+        self._version += 1
 
         return self
 
@@ -181,25 +299,288 @@ class Condition:
         must have argment 'path'(str) & must return 'result'(bool).
         """
         self.condition_func.append(condition)
+        self._version += 1
 
         return self
 
     def reset_condition_func(self) -> Condition:
         """reset original conditions"""
         self.condition_func = []
+        self._version += 1
 
         return self
 
+    def evaluate_many(
+        self, paths: List[str], context: ConditionContext = None
+    ) -> List[bool]:
+        """Evaluate this condition over many paths at once.
+        'context' must describe the directory holding all of 'paths'.
+
+        Returns:
+            List[bool]: Boolean mask (numpy.ndarray when NumPy is installed).
+        """
+        return to_mask(build_batch_predicate(self)(paths, context), len(paths))
+
+    def fingerprint(self) -> Tuple:
+        """Hashable summary of the rules (condition functions by identity),
+        recomputed only after this condition is changed through its methods."""
+        if self._fingerprint is None or self._fingerprint[0] != self._version:
+            rules = tuple(
+                tuple(value) if isinstance(value, list) else value
+                for key, value in vars(self).items()
+                if not key.startswith("_")
+            )
+            self._fingerprint = (self._version, rules)
+        return self._fingerprint[1]
+
+    def compile(self) -> CompiledCondition:
+        """Compile this condition into an optimized predicate.
+        Later changes to this condition are not reflected in the returned predicate.
+        """
+        return CompiledCondition([self])
+
     def __str__(self) -> str:
 
         cond_str = "Condition\n"
         for key, value in vars(self).items():
-            if value:
-                cond_str += " - " + key + " : [" + ",".join(value) + "]\n"
+            if value and not key.startswith("_"):
+                if isinstance(value, list):
+                    value = ",".join(str(element) for element in value)
+                cond_str += " - " + key + " : [" + str(value) + "]\n"
 
         return cond_str
 
 
+class CompiledCondition:
+    """Predicate compiled from conditions. A file passes if it matches any of them.
+
+    Extensions & directory names are looked up in sets, filename literals are
+    matched by one precompiled regex & evaluation stops at the first matching
+    condition. Plain callables are accepted as conditions & called with the path only.
+    """
+
+    def __init__(self, conditions: List[Condition | Callable[[str], bool]]) -> None:
+        self.conditions = conditions
+        self.predicates = [
+            (
+                condition.predicate()
+                if isinstance(condition, Condition)
+                else self.wrap_callable(condition)
+            )
+            for condition in conditions
+        ]
+        self.batch_predicates = [
+            (
+                build_batch_predicate(condition)
+                if isinstance(condition, Condition)
+                else None
+            )
+            for condition in conditions
+        ]
+        self.dirc_excluders = [
+            (
+                NameMatcher(condition.exclude_dirc, condition.exclude_dirc_glob)
+                if isinstance(condition, Condition)
+                else None
+            )
+            for condition in conditions
+        ]
+        self.path_matchers = [
+            (
+                self.build_path_matcher(condition)
+                if isinstance(condition, Condition)
+                else None
+            )
+            for condition in conditions
+        ]
+        self.dirc_pruner = DircPruner(self.dirc_excluders, self.path_matchers)
+
+    def __call__(self, file_path: str, context: ConditionContext = None) -> bool:
+        for predicate in self.predicates:
+            if predicate(file_path, context):
+                return True
+        return False
+
+    def evaluate_many(
+        self, paths: List[str], context: ConditionContext = None
+    ) -> List[bool]:
+        """Evaluate over many paths at once. Rows matched by one condition
+        are not evaluated by the following ones.
+        'context' must describe the directory holding all of 'paths'.
+
+        Returns:
+            List[bool]: Boolean mask (numpy.ndarray when NumPy is installed).
+        """
+        matched = []
+        remain = list(range(len(paths)))
+        for predicate, batch_predicate in zip(self.predicates, self.batch_predicates):
+            if remain == []:
+                break
+            targets = [paths[row] for row in remain]
+            if batch_predicate is not None:
+                hit = set(batch_predicate(targets, context))
+            else:
+                hit = {i for i, path in enumerate(targets) if predicate(path, context)}
+            matched += [remain[i] for i in hit]
+            remain = [row for i, row in enumerate(remain) if i not in hit]
+
+        return to_mask(matched, len(paths))
+
+    def uses_metadata(self) -> bool:
+        """Whether any condition has size, mtime or file type rules."""
+        return any(
+            isinstance(condition, Condition) and condition.uses_metadata()
+            for condition in self.conditions
+        )
+
+    def prunes_dirc(self, dirc_name: str, dirc_path: str = None) -> bool:
+        """Whether no file below a directory named 'dirc_name' can match,
+        because every condition excludes that directory (or, given 'dirc_path',
+        no path pattern of the condition can match below it)."""
+        return self.dirc_pruner(dirc_name, dirc_path)
+
+    @staticmethod
+    def build_path_matcher(condition: Condition) -> PathMatcher | None:
+        """Build the path pattern matcher of one condition, None without patterns."""
+        if not condition.path_glob and not condition.path_regex:
+            return None
+        return PathMatcher(condition.path_glob, condition.path_regex)
+
+    @staticmethod
+    def wrap_callable(condition: Callable[[str], bool]) -> Callable[..., bool]:
+        """Adapt a plain callable to the predicate signature."""
+        return lambda file_path, context=None: condition(file_path)
+
+    @staticmethod
+    def build_literal_matcher(literals: List[str]) -> Callable[[str], bool] | None:
+        """Build a matcher which tells whether any of 'literals' is in the name."""
+        if not literals:
+            return None
+        if len(literals) == 1:
+            literal = literals[0]
+            return lambda name: literal in name
+
+        literals = sorted(set(literals), key=len, reverse=True)
+        search = re.compile("|".join(re.escape(literal) for literal in literals)).search
+        return lambda name: search(name) is not None
+
+    @staticmethod
+    def build_predicate(condition: Condition) -> Callable[[str], bool]:
+        """Build the predicate of one condition."""
+
+        only_terminal_file = condition.only_terminal_file
+        contain_dirc = NameMatcher(condition.contain_dirc, condition.contain_dirc_glob)
+        exclude_dirc = NameMatcher(condition.exclude_dirc, condition.exclude_dirc_glob)
+        extention = frozenset(condition.extention)
+        exclude_extention = frozenset(condition.exclude_extention)
+        contain_literal = CompiledCondition.build_literal_matcher(
+            condition.contain_literal
+        )
+        exclude_literal = CompiledCondition.build_literal_matcher(
+            condition.exclude_literal
+        )
+        path_matcher = CompiledCondition.build_path_matcher(condition)
+        meta_check = build_meta_check(condition)
+        condition_func = tuple(condition.condition_func)
+
+        sep = os.sep
+        altsep = "/" if sep == "\\" else "\\"
+        check_dirc = bool(contain_dirc or exclude_dirc)
+
+        def predicate(file_path: str, context: ConditionContext = None) -> bool:
+            given_path = file_path
+            file_path = file_path.replace(altsep, sep)
+            dirs_path, file_name = os.path.split(file_path)
+
+            if extention or exclude_extention:
+                ext = os.path.splitext(file_name)[-1][1:]
+                if extention and ext not in extention:
+                    return False
+                if ext in exclude_extention:
+                    return False
+
+            if contain_literal is not None and not contain_literal(file_name):
+                return False
+            if exclude_literal is not None and exclude_literal(file_name):
+                return False
+
+            if check_dirc:
+                dircs = dirs_path.split(sep)
+                if contain_dirc and not contain_dirc.match_any(dircs):
+                    return False
+                if exclude_dirc and exclude_dirc.match_any(dircs):
+                    return False
+
+            if only_terminal_file and context is not None:
+                if not context.terminal:
+                    return False
+            elif only_terminal_file:
+                for mem in os.listdir(dirs_path):
+                    if os.path.isdir(os.path.join(dirs_path, mem)):
+                        return False
+
+            if path_matcher is not None and not path_matcher.match(file_path):
+                return False
+
+            if meta_check is not None and not meta_check(given_path, context):
+                return False
+
+            for condition in condition_func:
+                if not condition(file_path):
+                    return False
+
+            return True
+
+        return predicate
+
+
+def compile_conditions(conditions: List[Condition]) -> CompiledCondition | None:
+    """Compile a condition, a list or a dict of conditions into one predicate.
+
+    Returns:
+        CompiledCondition|None: None when no condition is specified.
+    """
+    if conditions is None or isinstance(conditions, CompiledCondition):
+        return conditions
+    if isinstance(conditions, dict):
+        conditions = [conditions[k] for k in conditions]
+    if not isinstance(conditions, Iterable):
+        conditions = [conditions]
+
+    if conditions != [] and all(condition is None for condition in conditions):
+        return None
+
+    return CompiledCondition(
+        [condition for condition in conditions if condition is not None]
+    )
+
+
+class ChangeReport:
+    """Changes found by Directory.refresh()"""
+
+    def __init__(self) -> None:
+        self.added_files = []
+        self.removed_files = []
+        self.added_dircs = []
+        self.removed_dircs = []
+        self.rescanned_dircs = []
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added_files
+            or self.removed_files
+            or self.added_dircs
+            or self.removed_dircs
+        )
+
+    def __str__(self) -> str:
+        report_str = "ChangeReport\n"
+        for key, value in vars(self).items():
+            report_str += f" - {key} : {len(value)}\n"
+
+        return report_str
+
+
 class Directory:
     """This class is used to represent a directory in a database collector."""
 
@@ -221,13 +602,71 @@ class Directory:
 
         self.empty = empty
 
-        self.file_member = []
+        self._file_member = []
+        self._files_shared = False
+        self._lazy_files = None
+
         self.dirc_member = []
         self.terminal = True
+        self.mtime = None
+        self.pruned = False
+        self.file_meta = None
+
+        self._dirc_index = None
+        self._file_names = None
+        self._tree_version = TreeVersion()
 
     def __str__(self) -> str:
         return self.path
 
+    @property
+    def file_member(self) -> List[str]:
+        """Paths of the files directly under this directory.
+        A list shared with a clone is copied first, so it can be changed in place."""
+        return self.own_files()
+
+    @property
+    def _files(self) -> List[str]:
+        """file_member without copying a list shared with a clone (not to be changed).
+        Filtered members of a clone are selected here on first access."""
+        lazy = self._lazy_files
+        if lazy is not None:
+            files, conditions, context = lazy
+            self._file_member = self.select_files(files, conditions, context)
+            self._lazy_files = None
+        return self._file_member
+
+    @file_member.setter
+    def file_member(self, file_member: List[str]) -> None:
+        self._file_member = file_member
+        self._files_shared = False
+        self._lazy_files = None
+
+    def own_files(self) -> List[str]:
+        """Get file_member (& file_meta) to be changed in place,
+        copied first when they are shared with a clone."""
+        file_member = self._files
+        if self._files_shared:
+            file_member = self._file_member = list(file_member)
+            if self.file_meta is not None:
+                self.file_meta = self.file_meta.copy()
+            self._files_shared = False
+        return file_member
+
+    @property
+    def version(self) -> int:
+        """Number of changes made to the structure this instance belongs to."""
+        return self._tree_version.value
+
+    def new_member(self, dirc_name: str, empty: bool = None) -> Directory:
+        """Make an unlisted child instance belonging to the same structure
+        (not added to dirc_member)."""
+        dirc = Directory(
+            os.path.join(self.path, dirc_name), self.empty if empty is None else empty
+        )
+        dirc._tree_version = self._tree_version
+        return dirc
+
     def __eq__(self, __o: str) -> bool:
         if not isinstance(__o, str):
             raise NotImplementedError()
@@ -240,30 +679,118 @@ class Directory:
         if path_route[0] == ".":
             path_route = path_route[1:]
 
-        if len(path_route) == 1:
-            if path_route[0] == "":
-                return self
-            if path_route[0] in self.file_member:
-                return self
-            for dirc in self.dirc_member:
-                if path_route[0] == dirc:
+        return self.resolve(path_route)
+
+    def get_dirc_index(self) -> Dict[str, Directory]:
+        """Get {name: child Directory} of dirc_member, cached until dirc_member changes."""
+        cache = self._dirc_index
+        dirc_member = self.dirc_member
+        if cache is None or cache[0] is not dirc_member or cache[1] != len(dirc_member):
+            cache = (dirc_member, len(dirc_member), {d.name: d for d in dirc_member})
+            self._dirc_index = cache
+        return cache[2]
+
+    def get_file_names(self) -> Set[str]:
+        """Get the set of file_member names, cached until file_member changes."""
+        cache = self._file_names
+        file_member = self._files
+        if cache is None or cache[0] is not file_member or cache[1] != len(file_member):
+            names = {os.path.basename(file) for file in file_member}
+            cache = (file_member, len(file_member), names)
+            self._file_names = cache
+        return cache[2]
+
+    def resolve(self, path_route: List[str]) -> Directory | None:
+        """Follow the names of 'path_route' through the child indexes.
+        When the last name is a file member, its owner directory instance is returned.
+        """
+        dirc = self
+        for depth, name in enumerate(path_route):
+            last = depth == len(path_route) - 1
+            if name == "" and last:
+                return dirc
+            child = dirc.get_dirc_index().get(name)
+            if child is None:
+                if last and name in dirc.get_file_names():
                     return dirc
-            return None
-        else:
-            for dirc in self.dirc_member:
-                if path_route[0] == dirc:
-                    return dirc("/".join(path_route[1:]))
-            return None
+                return None
+            dirc = child
+
+        return dirc
+
+    def build_index(self, files: bool = True) -> PathIndex:
+        """Build a path -> Directory index over the whole structure below this instance.
+        The index is not updated when the structure changes.
+        """
+        return PathIndex(self, files=files)
+
+    def build_structure(
+        self,
+        workers: int = 1,
+        prune: Callable[[str], bool] = None,
+        processes: int = 1,
+        stats: WalkStats = None,
+        metadata: bool = False,
+    ) -> Directory:
+        """Generate & build directory structure
 
-    def build_structure(self):
-        """Generate & build directory structure"""
+        Args:
+            workers (int, optional): Number of threads listing directories. Defaults to 1.
+            prune (Callable[[str], bool], optional): Directory-name predicate.
+                Matching directories are kept as unlisted members (pruned=True). Defaults to None.
+            processes (int, optional): List each top-level subtree in one of 'processes'
+                worker processes instead of threads ('prune' must be picklable). Defaults to 1.
+            stats (WalkStats, optional): Records the listings. Defaults to None.
+            metadata (bool, optional): Capture the size, mtime & type of every file
+                (file_meta) for metadata rules of Condition. Defaults to False.
+        """
 
-        self.update_member(self.empty)
+        self.update_member(
+            self.empty,
+            workers=workers,
+            prune=prune,
+            processes=processes,
+            stats=stats,
+            metadata=metadata,
+        )
+
+        return self
+
+    async def abuild_structure(
+        self,
+        concurrency: int = 16,
+        prune: Callable[[str], bool] = None,
+        stats: WalkStats = None,
+        metadata: bool = False,
+    ) -> Directory:
+        """Coroutine version of build_structure(), listing up to 'concurrency'
+        directories at once without blocking the event loop.
+
+        Args:
+            concurrency (int, optional): Maximum number of listings in flight. Defaults to 16.
+            prune (Callable[[str], bool], optional): Directory-name predicate.
+                Matching directories are kept as unlisted members (pruned=True). Defaults to None.
+            stats (WalkStats, optional): Records the listings. Defaults to None.
+            metadata (bool, optional): Capture file metadata (file_meta). Defaults to False.
+        """
+        self.destruct()
+        self.pruned = False
+
+        def visit(dirc: Directory, listing: Tuple[List[str], List[str], int]):
+            return dirc.set_member(*listing, empty=self.empty, prune=prune)
+
+        scanner = scan_dirc_meta if metadata else scan_dirc
+        if stats is not None:
+            scanner = stats.timed(scanner)
+        await async_walk(self, self.path, visit, concurrency, scanner)
 
         return self
 
     def get_file_path(
-        self, conditions: List[Condition], serialize: bool = False
+        self,
+        conditions: List[Condition],
+        serialize: bool = False,
+        stats: WalkStats = None,
     ) -> list:
         """Get the path to the file matching the condition.
 
@@ -271,26 +798,116 @@ class Directory:
         -----
             condition (Condition): The conditions of the file to be acquired are described.
             serialize (bool): Specifies how the directory list is returned.
+            stats (WalkStats): Counts the condition evaluations.
         """
+        conditions = compile_conditions(conditions)
+        if conditions is None:
+            raise TypeError("'conditions' must be specified.")
+
+        if serialize:
+            return list(self.iter_file_path(conditions, stats=stats))
+
+        # subtrees where nothing can match keep their (empty) lists only
         file_list = []
+        stack = [(self, file_list, True)]
+        while stack:
+            dirc, dirc_list, alive = stack.pop()
+            if alive:
+                dirc_list += dirc.get_own_file_path(conditions, stats)
+            children = []
+            for child in dirc.dirc_member:
+                child_list = []
+                dirc_list.append(child_list)
+                child_alive = alive and not conditions.prunes_dirc(
+                    child.name, child.path
+                )
+                children.append((child, child_list, child_alive))
+            stack += reversed(children)
 
-        if isinstance(conditions, dict):
-            conditions = [conditions[k] for k in conditions]
-        if not isinstance(conditions, Iterable):
-            conditions = [conditions]
+        return file_list
 
-        for file in self.file_member:
-            if sum([condition(file) for condition in conditions]) != 0:
-                out_form_path = "/".join(file.split(os.sep))
-                file_list.append(out_form_path)
+    def iter_file_path(
+        self,
+        conditions: List[Condition],
+        sort: bool = False,
+        stats: WalkStats = None,
+    ) -> Iterator[str]:
+        """Yield the path to the file matching the condition in get_file_path(serialize=True) order.
 
-        for dirc in self.dirc_member:
-            if serialize:
-                file_list += dirc.get_file_path(conditions, serialize=serialize)
-            else:
-                file_list.append(dirc.get_file_path(conditions, serialize=serialize))
+        Args:
+        -----
+            condition (Condition): The conditions of the file to be acquired are described.
+            sort (bool): Visit directories & files in name order, independent of listing order.
+            stats (WalkStats): Counts the condition evaluations.
+        """
+        for group in self.iter_grouped_file_path(conditions, sort=sort, stats=stats):
+            yield from group
 
-        return file_list
+    def iter_grouped_file_path(
+        self,
+        conditions: List[Condition],
+        sort: bool = False,
+        stats: WalkStats = None,
+    ) -> Iterator[List[str]]:
+        """Yield the paths to the matching files grouped by directory, in pre-order.
+
+        Same as Collector.group_dir_file(get_file_path(conditions)),
+        without building the nested structure.
+
+        Args:
+        -----
+            condition (Condition): The conditions of the file to be acquired are described.
+            sort (bool): Visit directories & files in name order, independent of listing order.
+            stats (WalkStats): Counts the condition evaluations.
+        """
+        conditions = compile_conditions(conditions)
+        if conditions is None:
+            raise TypeError("'conditions' must be specified.")
+
+        stack = [self]
+        while stack:
+            dirc = stack.pop()
+            files = dirc.get_own_file_path(conditions, stats)
+            children = dirc.dirc_member
+            if sort:
+                files.sort()
+                children = sorted(children, key=lambda child: child.name)
+            if files:
+                yield files
+            stack += [
+                child
+                for child in reversed(children)
+                if not conditions.prunes_dirc(child.name, child.path)
+            ]
+
+    def get_own_file_path(
+        self, conditions: CompiledCondition, stats: WalkStats = None
+    ) -> List[str]:
+        """Get the path to the file matching the condition directly under this directory."""
+        file_member = self._files
+        if stats is not None:
+            stats.add_condition_evals(len(file_member))
+        files = self.select_files(file_member, conditions, self.get_context(stats))
+        return ["/".join(file.split(os.sep)) for file in files]
+
+    @staticmethod
+    def select_files(
+        files: List[str],
+        conditions: CompiledCondition,
+        context: ConditionContext = None,
+    ) -> List[str]:
+        """Select the files matching compiled conditions.
+        Batch evaluation is used for BATCH_THRESHOLD files or more.
+        """
+        if len(files) >= BATCH_THRESHOLD:
+            mask = conditions.evaluate_many(files, context)
+            return [file for file, matched in zip(files, mask) if matched]
+
+        return [file for file in files if conditions(file, context)]
+
+    def get_context(self, stats: WalkStats = None) -> ConditionContext:
+        """Get ConditionContext describing this directory for its file members."""
+        return ConditionContext(self, self.terminal, self.file_meta, stats)
 
     def get_grouped_path_list(self, key: Callable[[str], str]) -> List[List[str]]:
         """Get grouped file path list with 'key'.
@@ -304,7 +921,7 @@ class Directory:
 
         grouped = {}
 
-        for mem in self.file_member:
+        for mem in self._files:
             name = os.path.basename(mem)
 
             group = key(name)
@@ -334,9 +951,12 @@ class Directory:
     ) -> list:
         """Get the Directory instance list while preserving file structure
         or Get Directory instance serialized list.
+        Pruned (unlisted) directories are left out.
         """
         dir_list = []
 
+        if self.pruned:
+            return []
         if self.terminal:
             return [self]
 
@@ -367,18 +987,10 @@ class Directory:
         Returns:
             Directory|None
         """
-        if os.path.isfile(path):
-            path = os.path.dirname(path)
         if path == "":
             return self
 
-        dirc_list = re.split(r"[\\|/]", path)
-        for direc in self.dirc_member:
-            if direc == dirc_list[0]:
-                if len(dirc_list) == 1:
-                    return direc
-                return direc.get_specify_instance(os.sep.join(dirc_list[1:]))
-        return None
+        return self.resolve(re.split(r"[\\|/]", path))
 
     def get_abspath(self) -> str:
         """get absolute path which is sep by '/'"""
@@ -387,29 +999,51 @@ class Directory:
     def clone(self, conditions: List[Condition] = None) -> Directory:
         """copy Directory structure (option: with condition)"""
 
-        clone = Directory(self.path, self.empty)
-
-        if isinstance(conditions, dict):
-            conditions = [conditions[k] for k in conditions]
-        if not isinstance(conditions, Iterable):
-            conditions = [conditions]
-
-        clone.file_member = self.file_member.copy()
-        clone.dirc_member = [
-            directory.clone(conditions) for directory in self.dirc_member
-        ]
-        clone.terminal = self.terminal
-
-        if conditions == [None]:
-            return clone
-
-        new_list = []
-        for file in clone.file_member:
-            if sum([condition(file) for condition in conditions]) != 0:
-                new_list.append(file)
-        clone.file_member = new_list
+        return self.clone_into(compile_conditions(conditions), TreeVersion())
 
-        return clone
+    def clone_into(
+        self,
+        conditions: CompiledCondition | None,
+        tree_version: TreeVersion,
+        files: bool = True,
+    ) -> Directory:
+        """clone() whose instances belong to the structure of 'tree_version'.
+
+        File lists are shared (copy-on-write) instead of copied & filtered ones
+        are selected on first access. Without 'files', file members are left empty.
+        """
+        root = None
+        stack = [(self, None)]
+        while stack:
+            source, parent = stack.pop()
+            clone = Directory(source.path, source.empty)
+            clone._tree_version = tree_version
+            clone.terminal = source.terminal
+            clone.mtime = source.mtime
+            clone.pruned = source.pruned
+            if files:
+                clone.share_files(source, conditions)
+
+            if parent is None:
+                root = clone
+            else:
+                parent.dirc_member.append(clone)
+            stack += [(child, clone) for child in reversed(source.dirc_member)]
+
+        return root
+
+    def share_files(self, source: Directory, conditions: CompiledCondition = None):
+        """Take the file members of 'source' without copying them."""
+        file_member = source._files
+        # neither side may change the shared list (& metadata) in place from now on
+        source._files_shared = True
+        self._files_shared = True
+        self.file_meta = source.file_meta
+        if conditions is None:
+            self._file_member = file_member
+        else:
+            self._file_member = []
+            self._lazy_files = (file_member, conditions, source.get_context())
 
     def incarnate(
         self,
@@ -417,11 +1051,23 @@ class Directory:
         conditions: List[Condition] = None,
         printer: Callable[[str], Any] = print,
         get_incarnated: bool = False,
+        workers: int = 1,
+        mode: str = "copy",
+        progress: Callable[[CopyProgress], Any] = None,
     ) -> int | Directory:
         """
         Incarnating instance as an actual directory.
 
         If a Condition is specified, the corresponding file will also be copied.
+        Directories are made first, then all files are copied on 'workers' threads.
+
+        Args
+        ----
+        printer (Callable[[str], Any]): Gets every existing target which is skipped &
+            one line with the CopyProgress once the files are copied. None: no output.
+        workers (int): Number of copy threads.
+        mode (str): "copy", "hardlink" or "symlink".
+        progress (Callable[[CopyProgress], Any]): Called after every finished file.
 
         Returns
         -------
@@ -436,81 +1082,364 @@ class Directory:
 
         path = os.sep.join(path.split("/"))
 
-        if isinstance(conditions, dict):
-            conditions = [conditions[k] for k in conditions]
-        if not isinstance(conditions, Iterable):
-            conditions = [conditions]
+        conditions = compile_conditions(conditions)
+
+        jobs = []
+        mk_number = self.plan_incarnate(path, conditions, printer, jobs)
+        self.run_copy(jobs, printer, workers=workers, mode=mode, progress=progress)
 
+        if get_incarnated:
+            return Directory(self.path).build_structure()
+
+        return mk_number
+
+    def plan_incarnate(
+        self,
+        path: str,
+        conditions: CompiledCondition,
+        printer: Callable[[str], Any],
+        jobs: List[Tuple[str, str]],
+    ) -> int:
+        """Make directories of incarnate() & add file copy jobs to 'jobs'.
+
+        Returns:
+            int: number of made directory
+        """
         mk_number = 0
 
         mk_path = os.path.join(path, self.name)
-        if sum([condition(mk_path) for condition in conditions]) != 0:
+        if conditions is not None and conditions(mk_path):
             return 0
         if not os.path.isdir(mk_path):
             os.mkdir(mk_path)
             mk_number += 1
         if conditions is not None:
-            self.copy_file(mk_path, conditions, printer)
+            jobs += self.plan_copy(mk_path, conditions, printer)
 
         for dirc in self.dirc_member:
-            mk_number += dirc.incarnate(mk_path, conditions, printer)
-
-        if get_incarnated:
-            return Directory(self.path).build_structure()
+            mk_number += dirc.plan_incarnate(mk_path, conditions, printer, jobs)
 
         return mk_number
 
     def hollow(self) -> Directory:
-        """clone instance & remove its file member"""
+        """clone instance without its file member (file lists are never copied)"""
 
-        target = self.clone()
-        target.file_member = []
-        for children in target.dirc_member:
-            children.hollow()
+        return self.clone_into(None, TreeVersion(), files=False)
 
-        return target
+    def update_member(
+        self,
+        empty: bool = False,
+        workers: int = 1,
+        prune: Callable[[str], bool] = None,
+        processes: int = 1,
+        stats: WalkStats = None,
+        metadata: bool = False,
+    ):
+        """update directory member
 
-    def update_member(self, empty: bool = False):
-        """update directory member"""
+        Args:
+            empty (bool, optional): Do not keep file members. Defaults to False.
+            workers (int, optional): Number of threads listing directories. Defaults to 1.
+            prune (Callable[[str], bool], optional): Directory-name predicate.
+                Matching directories are kept as unlisted members (pruned=True). Defaults to None.
+            processes (int, optional): Number of processes listing top-level subtrees.
+                Defaults to 1.
+            stats (WalkStats, optional): Records the listings. Listings made in worker
+                processes are counted without timings. Defaults to None.
+            metadata (bool, optional): Capture file metadata (file_meta). Defaults to False.
+        """
 
-        list_member = os.listdir(self.path)
-        dirc_member = []
-        file_member = []
-        for member in list_member:
-            if os.path.isfile(os.path.join(self.path, member)):
-                file_member.append(os.path.join(self.path, member))
+        self.destruct()
+        self.pruned = False
+
+        def visit(dirc: Directory, listing: Tuple[List[str], List[str], int]):
+            return dirc.set_member(*listing, empty=empty, prune=prune)
+
+        scanner = scan_dirc_meta if metadata else scan_dirc
+        if processes > 1:
+            if stats is None:
+                shard_visit = visit
             else:
-                dirc_member.append(member)
 
-        self.destruct()
+                def shard_visit(
+                    dirc: Directory, listing: Tuple[List[str], List[str], int]
+                ):
+                    stats.add_listing(dirc.path, listing)
+                    return visit(dirc, listing)
 
+            shard_walk(
+                self, self.path, shard_visit, processes, prune=prune, scanner=scanner
+            )
+        else:
+            if stats is not None:
+                scanner = stats.timed(scanner)
+            walk(self, self.path, visit, workers=workers, scanner=scanner)
+
+    def set_member(
+        self,
+        file_names: List[str],
+        dirc_names: List[str],
+        mtime: int = None,
+        file_meta: Dict[str, FileMeta] = None,
+        empty: bool = False,
+        prune: Callable[[str], bool] = None,
+    ) -> List[Tuple[Directory, str]]:
+        """Set members from one directory listing.
+        'mtime' is the st_mtime_ns of this directory when it was listed &
+        'file_meta' the metadata of its files (by name) when it was captured.
+        Child directories matching 'prune' are marked as pruned & never listed.
+
+        Returns:
+            List[Tuple[Directory, str]]: new child instances to be listed & their paths.
+        """
+
+        self._tree_version.bump()
         self.dirc_member = [
-            Directory(os.path.join(self.path, dirc_name), empty)
-            for dirc_name in dirc_member
+            self.new_member(dirc_name, empty) for dirc_name in dirc_names
         ]
-        self.file_member = file_member
-
-        self.terminal = len(dirc_member) == 0
-        for dirc in self.dirc_member:
-            dirc.update_member(empty)
+        if prune is not None:
+            for dirc in self.dirc_member:
+                dirc.pruned = prune_dirc(prune, dirc.path)
+        self.file_member = [
+            os.path.join(self.path, file_name) for file_name in file_names
+        ]
+        self.terminal = len(dirc_names) == 0
+        self.mtime = mtime
+        self.file_meta = file_meta
 
         if empty:
             self.file_member = []
+            self.file_meta = None
+
+        return [(dirc, dirc.path) for dirc in self.dirc_member if not dirc.pruned]
+
+    def refresh(
+        self,
+        workers: int = 1,
+        prune: Callable[[str], bool] = None,
+        stats: WalkStats = None,
+        metadata: bool = False,
+    ) -> ChangeReport:
+        """Update directory member incrementally.
+
+        Only directories whose mtime changed since they were listed are listed again.
+        Unchanged child instances are kept & members are patched, not rebuilt.
+
+        Args:
+            workers (int, optional): Number of threads for stat & listing. Defaults to 1.
+            prune (Callable[[str], bool], optional): Directory-name predicate applied to
+                new directories & to pruned ones, which are listed when it no longer
+                matches. When None, pruned directories stay as they are. Defaults to None.
+            stats (WalkStats, optional): Records the stale checks & listings. Defaults to None.
+            metadata (bool, optional): Capture file metadata of listed directories.
+                Rewriting a file keeps the mtime of its directory, so metadata of
+                unchanged directories is dropped & stat'ed again when a rule needs it.
+                Defaults to False.
+
+        Returns:
+            ChangeReport: Added & removed files and directories.
+        """
+        report = ChangeReport()
+        scanner = scan_dirc_meta if metadata else scan_dirc
+        if stats is not None:
+            scanner = stats.timed(scanner)
+
+        def scan_if_stale(task: Tuple[str, int]):
+            path, mtime = task
+            if mtime is not None:
+                if stats is not None:
+                    stats.add_fs_calls()
+                if os.stat(path).st_mtime_ns == mtime:
+                    return None
+            return scanner(path)
+
+        def visit(dirc: Directory, listing: Tuple[List[str], List[str], int]):
+            if listing is not None:
+                dirc.patch_member(*listing, report=report, prune=prune)
+            else:
+                dirc.file_meta = None
+            children = []
+            for child in dirc.dirc_member:
+                if (
+                    child.pruned
+                    and prune is not None
+                    and not prune_dirc(prune, child.path)
+                ):
+                    child.pruned = False
+                    child.mtime = None
+                if not child.pruned:
+                    children.append((child, (child.path, child.mtime)))
+            return children
+
+        walk(self, (self.path, self.mtime), visit, workers, scanner=scan_if_stale)
+
+        return report
+
+    def patch_member(
+        self,
+        file_names: List[str],
+        dirc_names: List[str],
+        mtime: int = None,
+        file_meta: Dict[str, FileMeta] = None,
+        report: ChangeReport = None,
+        prune: Callable[[str], bool] = None,
+    ) -> None:
+        """Patch members with a new directory listing, keeping known child instances.
+        New child instances are left unlisted (mtime is None) & marked as pruned
+        when they match 'prune'.
+        """
+        if report is None:
+            report = ChangeReport()
+        report.rescanned_dircs.append(self.path)
+        self._tree_version.bump()
+
+        file_member = []
+        if not self.empty:
+            file_member = [
+                os.path.join(self.path, file_name) for file_name in file_names
+            ]
+            old_files = set(self._files)
+            new_files = set(file_member)
+            report.removed_files += [f for f in self._files if f not in new_files]
+            report.added_files += [f for f in file_member if f not in old_files]
+
+        old_dircs = {dirc.name: dirc for dirc in self.dirc_member}
+        dirc_member = []
+        for dirc_name in dirc_names:
+            dirc = old_dircs.pop(dirc_name, None)
+            if dirc is None:
+                dirc = self.new_member(dirc_name)
+                dirc.pruned = prune is not None and prune_dirc(prune, dirc.path)
+                report.added_dircs.append(dirc.path)
+            dirc_member.append(dirc)
+
+        for dirc in old_dircs.values():
+            stack = [dirc]
+            while stack:
+                removed = stack.pop()
+                report.removed_dircs.append(removed.path)
+                report.removed_files += removed._files
+                stack += removed.dirc_member
+
+        self.file_member = file_member
+        self.dirc_member = dirc_member
+        self.terminal = len(dirc_names) == 0
+        self.mtime = mtime
+        self.file_meta = None if self.empty else file_meta
+
+    def add_file(self, file_name: str, meta: FileMeta = None) -> str | None:
+        """Add one file member in place, keeping the name index up to date.
+        'meta' is kept when this directory holds file metadata.
+
+        Returns:
+            str|None: Path of the added file, None when it already is a member.
+        """
+        names = self.get_file_names()
+        if file_name in names:
+            return None
+
+        file_path = os.path.join(self.path, file_name)
+        if not self.empty:
+            self._tree_version.bump()
+            file_member = self.own_files()
+            file_member.append(file_path)
+            names.add(file_name)
+            self._file_names = (file_member, len(file_member), names)
+            if self.file_meta is not None:
+                if meta is None:
+                    self.file_meta = None
+                else:
+                    self.file_meta[file_name] = meta
+
+        return file_path
+
+    def set_file_meta(self, file_name: str, meta: FileMeta) -> None:
+        """Replace the metadata of one file member when this directory holds file metadata."""
+        if self.file_meta is None or file_name not in self.get_file_names():
+            return
+
+        self._tree_version.bump()
+        self.own_files()
+        self.file_meta[file_name] = meta
+
+    def remove_file(self, file_name: str) -> str | None:
+        """Remove one file member in place, keeping the name index up to date.
+
+        Returns:
+            str|None: Path of the removed file, None when it is not a member.
+        """
+        names = self.get_file_names()
+        if file_name not in names:
+            return None
+
+        file_path = os.path.join(self.path, file_name)
+        self._tree_version.bump()
+        file_member = self.own_files()
+        file_member.remove(file_path)
+        names.discard(file_name)
+        self._file_names = (file_member, len(file_member), names)
+
+        return file_path
+
+    def add_dirc(self, dirc: Directory) -> None:
+        """Add one child instance in place, keeping the child index up to date.
+        'dirc' & its subtree join the structure of this instance."""
+        stack = [dirc]
+        while stack:
+            node = stack.pop()
+            node._tree_version = self._tree_version
+            stack += node.dirc_member
+        self._tree_version.bump()
+
+        index = self.get_dirc_index()
+        self.dirc_member.append(dirc)
+        index[dirc.name] = dirc
+        self._dirc_index = (self.dirc_member, len(self.dirc_member), index)
+        self.terminal = False
+
+    def remove_dirc(self, dirc_name: str) -> Directory | None:
+        """Remove one child instance in place, keeping the child index up to date.
+
+        Returns:
+            Directory|None: The removed instance, None when it is not a member.
+        """
+        index = self.get_dirc_index()
+        dirc = index.pop(dirc_name, None)
+        if dirc is None:
+            return None
+
+        self._tree_version.bump()
+        self.dirc_member = [child for child in self.dirc_member if child is not dirc]
+        self._dirc_index = (self.dirc_member, len(self.dirc_member), index)
+        self.terminal = self.dirc_member == []
+
+        return dirc
 
     def remove_member(
         self,
         conditions: List[Condition] = None,
-        printer: Callable[[str], Any] = print,
-    ) -> int:
+        printer: Callable[[str], Any] = None,
+        workers: int = 1,
+        dry_run: bool = False,
+        get_summary: bool = False,
+    ) -> int | RemoveSummary:
         """Remove file members
 
+        Matching files are removed in batches (one directory per batch) on 'workers'
+        threads & dropped from file_member of their instances; nothing is listed again.
+        Files which could not be removed are kept & listed in the RemoveSummary.
+
         Args:
             conditions (List[Condition], optional): File remove conditons. Defaults to None.
-            printer (Callable[[str], Any], optional): Output stream.
-            When printer is None, output stream is stoped. Defaults to print.
+            printer (Callable[[str], Any], optional): Output stream of every removed,
+            failed (& planned) file. When printer is None, output stream is stoped.
+            Defaults to None.
+            workers (int, optional): Number of removing threads. Defaults to 1.
+            dry_run (bool, optional): Only report the matching files. Defaults to False.
+            get_summary (bool, optional): Return the RemoveSummary. Defaults to False.
 
         Returns:
-            int: Removed file member num.
+            int|RemoveSummary: Removed file member num.
         """
         if printer is None:
 
@@ -519,13 +1448,55 @@ class Directory:
 
             printer = no_wark
 
-        remove_files = self.get_file_path(conditions=conditions, serialize=True)
-        for file in remove_files:
-            os.remove(file)
-
-        self.update_member()
-
-        return len(remove_files)
+        conditions = compile_conditions(conditions)
+        if conditions is None:
+            raise TypeError("'conditions' must be specified.")
+
+        owners = []
+        batches = []
+        stack = [self]
+        while stack:
+            dirc = stack.pop()
+            files = self.select_files(dirc._files, conditions, dirc.get_context())
+            for start in range(0, len(files), REMOVE_BATCH_SIZE):
+                owners.append(dirc)
+                batches.append(files[start : start + REMOVE_BATCH_SIZE])
+            stack += reversed(dirc.dirc_member)
+
+        removed_files = {}
+
+        def on_batch(index: int, removed: List[str]):
+            for file in removed:
+                printer(f"rmvd: {file}")
+            removed_files.setdefault(id(owners[index]), set()).update(removed)
+
+        summary = remove_files(batches, workers, dry_run, on_batch)
+        for file, error in summary.failed:
+            printer(f"fail: {file} ({error})")
+        if dry_run:
+            for file in summary.removed:
+                printer(f"plan: {file}")
+
+        for dirc in {id(dirc): dirc for dirc in owners}.values():
+            removed = removed_files.get(id(dirc))
+            if removed:
+                dirc.discard_files(removed)
+
+        if get_summary:
+            return summary
+        return len(summary)
+
+    def discard_files(self, file_paths: Set[str]) -> None:
+        """Drop the members in 'file_paths' from file_member in one pass."""
+        self._tree_version.bump()
+        self.file_member = [file for file in self._files if file not in file_paths]
+        if self.file_meta is not None:
+            # a new dict, the old one may be shared with a clone
+            self.file_meta = {
+                name: meta
+                for name, meta in self.file_meta.items()
+                if os.path.join(self.path, name) not in file_paths
+            }
 
     def destruct(self) -> None:
         """Destruct members"""
@@ -545,8 +1516,21 @@ class Directory:
         conditions: List[Condition] = None,
         printer: Callable[[str], Any] = print,
         override: bool = False,
-    ):
-        """copy member files to path (option: with conditon)"""
+        workers: int = 1,
+        mode: str = "copy",
+        progress: Callable[[CopyProgress], Any] = None,
+    ) -> CopyProgress:
+        """copy member files to path (option: with conditon)
+
+        Args:
+            printer (Callable[[str], Any], optional): Gets every existing target which
+                is skipped & one line with the CopyProgress once the files are copied.
+                When printer is None, output stream is stoped. Defaults to print.
+            workers (int, optional): Number of copy threads. Defaults to 1.
+            mode (str, optional): "copy", "hardlink" or "symlink". Defaults to "copy".
+            progress (Callable[[CopyProgress], Any], optional):
+                Called after every finished file. Defaults to None.
+        """
         if printer is None:
 
             def no_wark(_):
@@ -556,22 +1540,86 @@ class Directory:
 
         path = os.sep.join(path.split("/"))
 
-        if isinstance(conditions, dict):
-            conditions = [conditions[k] for k in conditions]
-        if not isinstance(conditions, Iterable):
-            conditions = [conditions]
+        conditions = compile_conditions(conditions)
 
-        for file in self.file_member:
+        jobs = self.plan_copy(path, conditions, printer, override)
+        return self.run_copy(jobs, printer, override, workers, mode, progress)
+
+    def plan_copy(
+        self,
+        path: str,
+        conditions: CompiledCondition,
+        printer: Callable[[str], Any],
+        override: bool = False,
+    ) -> List[Tuple[str, str]]:
+        """List (source, target) pairs of copy_file(). Existing targets are reported
+        through 'printer' & skipped unless 'override'."""
+        jobs = []
+
+        context = self.get_context()
+        for file in self._files:
             file_path = "/".join(file.split(os.sep))
             file_name = os.path.basename(file_path)
             target_path = "/".join([path, file_name])
 
-            if sum([condition(file) for condition in conditions]) != 0:
+            if conditions is None or conditions(file, context):
                 if not os.path.isfile(target_path) or override:
-                    shutil.copyfile(file_path, target_path)
-                    if os.path.isfile(target_path) and override:
-                        printer(f"ovrd: {file_path} -> {target_path}")
-                    else:
-                        printer(f"copy: {file_path} -> {target_path}")
+                    jobs.append((file_path, target_path))
                 else:
                     printer(f"exst: {file_path} -> {target_path}")
+
+        return jobs
+
+    @staticmethod
+    def run_copy(
+        jobs: List[Tuple[str, str]],
+        printer: Callable[[str], Any],
+        override: bool = False,
+        workers: int = 1,
+        mode: str = "copy",
+        progress: Callable[[CopyProgress], Any] = None,
+    ) -> CopyProgress:
+        """Transfer (source, target) pairs & report the aggregated CopyProgress through
+        'printer' once they are done (per-file progress goes to 'progress')."""
+        label = "ovrd" if override else "copy"
+        state = transfer_files(jobs, mode, workers, override, progress)
+        printer(f"{label}: {state}")
+        return state
+
+
+class PathIndex:
+    """Index from relative path to Directory instance over a whole structure.
+
+    Paths are relative to the indexed Directory, separated by '/' or '\\'.
+    A file path resolves to its owner directory instance.
+    """
+
+    def __init__(self, directory: Directory, files: bool = True) -> None:
+        self.directory = directory
+        self.dircs = {"": directory}
+        self.files = {}
+
+        stack = [(directory, "")]
+        while stack:
+            dirc, prefix = stack.pop()
+            if files:
+                for file in dirc._files:
+                    self.files[prefix + os.path.basename(file)] = dirc
+            for child in dirc.dirc_member:
+                child_prefix = prefix + child.name
+                self.dircs[child_prefix] = child
+                stack.append((child, child_prefix + "/"))
+
+    def __len__(self) -> int:
+        return len(self.dircs) + len(self.files)
+
+    def __call__(self, path: str) -> Directory | None:
+        names = [name for name in re.split(r"[\\/]", path) if name != ""]
+        if names and names[0] == ".":
+            names = names[1:]
+        key = "/".join(names)
+
+        dirc = self.dircs.get(key)
+        if dirc is None:
+            dirc = self.files.get(key)
+        return dirc
@@ -0,0 +1,186 @@
+"""Parallel content hashing with a persistent cache for database collector"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Tuple
+
+HASH_CHUNK_SIZE = 1 << 20
+
+# digests are written to the cache every this many files
+CACHE_FLUSH_SIZE = 1024
+
+# (st_dev, st_ino, st_size, st_mtime_ns)
+FileKey = Tuple[int, int, int, int]
+
+
+def file_key(stat: os.stat_result) -> FileKey:
+    """Cache key of a file. Any rewrite changes its size or mtime."""
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def hash_file(
+    path: str, algorithm: str = "sha256", chunk_size: int = HASH_CHUNK_SIZE
+) -> Tuple[str, FileKey]:
+    """Hash the contents of 'path' with chunked reads.
+
+    Returns:
+        Tuple[str, FileKey]: Hex digest & the key of the file after it was read.
+    """
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+        key = file_key(os.fstat(f.fileno()))
+
+    return digest.hexdigest(), key
+
+
+class HashCache:
+    """Persistent digests keyed by (device, inode, size, mtime_ns) in a SQLite file."""
+
+    def __init__(self, cache_path: str) -> None:
+        self.conn = sqlite3.connect(cache_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS digest (
+                dev INTEGER, ino INTEGER, size INTEGER, mtime INTEGER,
+                algorithm TEXT, value TEXT,
+                PRIMARY KEY (dev, ino, size, mtime, algorithm)
+            )
+            """)
+
+    def get(self, key: FileKey, algorithm: str) -> str | None:
+        """Cached digest of 'key', if any."""
+        row = self.conn.execute(
+            "SELECT value FROM digest"
+            " WHERE dev = ? AND ino = ? AND size = ? AND mtime = ? AND algorithm = ?",
+            (*key, algorithm),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def put_many(self, items: Iterable[Tuple[FileKey, str]], algorithm: str) -> None:
+        """Store (key, digest) pairs."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO digest VALUES (?, ?, ?, ?, ?, ?)",
+            [(*key, algorithm, value) for key, value in items],
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class HashResult:
+    """Digests of hashed files & duplicate detection over them."""
+
+    def __init__(self, algorithm: str) -> None:
+        self.algorithm = algorithm
+        self.digests = {}
+        self.hashed = 0
+        self.cached = 0
+        self.bytes_read = 0
+
+    def duplicates(self) -> List[List[str]]:
+        """Groups of paths with the same contents, each sorted, largest group first."""
+        groups = {}
+        for path, digest in self.digests.items():
+            groups.setdefault(digest, []).append(path)
+        duplicates = [sorted(paths) for paths in groups.values() if len(paths) > 1]
+        duplicates.sort(key=lambda paths: (-len(paths), paths[0]))
+        return duplicates
+
+    def write_manifest(self, manifest_path: str) -> None:
+        """Write '<digest>  <path>' lines sorted by path (the format of sha256sum & co)."""
+        with open(manifest_path, "w", encoding="utf-8", errors="surrogateescape") as f:
+            for path in sorted(self.digests):
+                f.write(f"{self.digests[path]}  {path}\n")
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self)} files ({self.hashed} hashed, {self.cached} cached), "
+            f"{self.bytes_read} bytes read"
+        )
+
+
+def hash_files(
+    paths: List[str],
+    algorithm: str = "sha256",
+    workers: int = 4,
+    cache_path: str = None,
+    chunk_size: int = HASH_CHUNK_SIZE,
+    progress: Callable[[int, int], Any] = None,
+) -> HashResult:
+    """Hash the contents of 'paths' on a pool of 'workers' threads.
+
+    Files are stat'ed first (in the pool) & looked up in the cache; only
+    files missing from it are read. New digests are written to the cache as
+    they come, so an interrupted run keeps its progress. A file changed while
+    it was read is reported with its digest but not cached.
+
+    Args:
+        paths (List[str]): Files to be hashed.
+        algorithm (str, optional): hashlib algorithm name. Defaults to "sha256".
+        workers (int, optional): Number of threads stat'ing & reading files. Defaults to 4.
+        cache_path (str, optional): SQLite hash cache file. Defaults to None (no cache).
+        chunk_size (int, optional): Read size in bytes. Defaults to HASH_CHUNK_SIZE.
+        progress (Callable[[int, int], Any], optional): Called as progress(done, total)
+            after every hashed file.
+
+    Returns:
+        HashResult: Digests of all 'paths'.
+    """
+    hashlib.new(algorithm)  # raises ValueError for unknown algorithms
+    result = HashResult(algorithm)
+    cache = HashCache(cache_path) if cache_path is not None else None
+
+    fresh = []
+    executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+    try:
+        keys = list(executor.map(lambda path: file_key(os.stat(path)), paths))
+
+        misses = []
+        for path, key in zip(paths, keys):
+            digest = cache.get(key, algorithm) if cache is not None else None
+            if digest is None:
+                misses.append((path, key))
+            else:
+                result.digests[path] = digest
+                result.cached += 1
+
+        def read(path: str) -> Tuple[str, FileKey]:
+            return hash_file(path, algorithm, chunk_size)
+
+        done = 0
+        for (path, key), (digest, read_key) in zip(
+            misses, executor.map(read, [path for path, _ in misses])
+        ):
+            result.digests[path] = digest
+            result.hashed += 1
+            result.bytes_read += read_key[2]
+            if cache is not None and read_key == key:
+                fresh.append((key, digest))
+                if len(fresh) >= CACHE_FLUSH_SIZE:
+                    cache.put_many(fresh, algorithm)
+                    fresh = []
+            done += 1
+            if progress is not None:
+                progress(done, len(misses))
+    finally:
+        # do not wait for queued reads when interrupted
+        executor.shutdown(cancel_futures=True)
+        if cache is not None:
+            cache.put_many(fresh, algorithm)
+            cache.close()
+
+    return result
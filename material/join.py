@@ -0,0 +1,117 @@
+"""Tree-wide grouping of related files for database collector"""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Dict, Hashable, Iterator, List, Tuple
+
+from .directory import CompiledCondition, Directory
+from .stats import WalkStats
+
+
+def file_stem(file_path: str) -> str:
+    """File name without its extension, the default join key."""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+class JoinReport:
+    """What join_files() could not pair.
+
+    'incomplete' maps the key of every group missing some role to the paths
+    found for it ({role: path}), 'duplicates' lists the (key, role, path) of
+    files whose role was already taken in their group.
+    """
+
+    def __init__(self) -> None:
+        self.complete = 0
+        self.incomplete = {}
+        self.duplicates = []
+
+    def missing(self, roles: List[str]) -> Dict[Hashable, List[str]]:
+        """{key: roles missing from the group} of the incomplete groups."""
+        return {
+            key: [role for role in roles if role not in found]
+            for key, found in self.incomplete.items()
+        }
+
+    def __str__(self) -> str:
+        return (
+            "JoinReport\n"
+            f" - complete : {self.complete}\n"
+            f" - incomplete : {len(self.incomplete)}\n"
+            f" - duplicates : {len(self.duplicates)}\n"
+        )
+
+
+def join_files(
+    directory: Directory,
+    conditions: Dict[str, CompiledCondition],
+    key: Callable[[str], Hashable] = file_stem,
+    report: JoinReport = None,
+    stats: WalkStats = None,
+) -> Iterator[Tuple[Hashable, Dict[str, str]]]:
+    """Pair the files matching each role's condition by 'key' in one pass over the structure.
+
+    A group is yielded as soon as every role has a file, & only its key is
+    kept afterwards, so memory grows with the number of groups waiting for a
+    role, not with the number of paths. Subtrees which no role can match
+    are skipped.
+
+    Args:
+        directory (Directory): Root of the structure.
+        conditions (Dict[str, CompiledCondition]): Compiled condition of each role.
+        key (Callable[[str], Hashable], optional): Group key of a file path ('/' separated).
+            Defaults to the file name without its extension.
+        report (JoinReport, optional): Receives the groups left incomplete at the
+            end & the duplicated files. Defaults to None.
+        stats (WalkStats, optional): Counts the condition evaluations. Defaults to None.
+
+    Yields:
+        Tuple[Hashable, Dict[str, str]]: (key, {role: path}) of every complete group.
+    """
+    if report is None:
+        report = JoinReport()
+    roles = list(conditions)
+    if roles == []:
+        return
+
+    pending = {}
+    done = set()
+
+    stack = [(directory, roles)]
+    while stack:
+        dirc, alive = stack.pop()
+        context = dirc.get_context(stats)
+        file_member = dirc.file_member
+        for role in alive:
+            if stats is not None:
+                stats.add_condition_evals(len(file_member))
+            for file in dirc.select_files(file_member, conditions[role], context):
+                file_path = "/".join(file.split(os.sep))
+                group_key = key(file_path)
+                if group_key in done:
+                    report.duplicates.append((group_key, role, file_path))
+                    continue
+                group = pending.setdefault(group_key, {})
+                if role in group:
+                    report.duplicates.append((group_key, role, file_path))
+                    continue
+                group[role] = file_path
+                if len(group) == len(roles):
+                    del pending[group_key]
+                    done.add(group_key)
+                    report.complete += 1
+                    yield group_key, {role: group[role] for role in roles}
+
+        children = []
+        for child in dirc.dirc_member:
+            child_alive = [
+                role
+                for role in alive
+                if not conditions[role].prunes_dirc(child.name, child.path)
+            ]
+            if child_alive:
+                children.append((child, child_alive))
+        stack += reversed(children)
+
+    report.incomplete = pending
@@ -0,0 +1,255 @@
+"""Memory-mappable file list manifest for database collector"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, Tuple
+
+MANIFEST_MAGIC = b"CLMANIF\0"
+MANIFEST_VERSION = 1
+
+# magic, version, flags, paths, directories, path bytes, directory path bytes
+HEADER = struct.Struct("<8sIIQQQQ")
+
+HAS_DIRCS = 1
+HAS_SIZES = 2
+BIG_ENDIAN = 4
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % 8)
+
+
+def write_manifest(
+    manifest_path: str,
+    file_paths: Iterable[str],
+    dircs: bool = False,
+    sizes: Iterable[int] = None,
+) -> int:
+    """Write file paths as a manifest readable by Manifest.
+
+    Layout (arrays in native byte order, every section aligned to 8 bytes):
+    header, path offsets (uint64 x paths+1), [directory ids (uint32 x paths),
+    directory path offsets (uint64 x directories+1)], [sizes (uint64 x paths)],
+    path blob (UTF-8), [directory path blob (UTF-8)].
+    The file is written to a temporary path first & moved into place.
+
+    Args:
+        manifest_path (str): Output manifest file path.
+        file_paths (Iterable[str]): Paths, in the order of their indices.
+        dircs (bool, optional): Store the directory of every path as an id into a
+            table of directory paths. Defaults to False.
+        sizes (Iterable[int], optional): File sizes in bytes, in the order of
+            'file_paths'. Defaults to None (not stored).
+
+    Returns:
+        int: Number of written paths.
+    """
+    offsets = array("Q", [0])
+    blob = bytearray()
+    dirc_ids = array("I")
+    dirc_index = {}
+    for file_path in file_paths:
+        blob += file_path.encode("utf-8", "surrogateescape")
+        offsets.append(len(blob))
+        if dircs:
+            dirc_path = file_path.rpartition("/")[0]
+            dirc_ids.append(dirc_index.setdefault(dirc_path, len(dirc_index)))
+    count = len(offsets) - 1
+
+    dirc_offsets = array("Q", [0])
+    dirc_blob = bytearray()
+    for dirc_path in dirc_index:
+        dirc_blob += dirc_path.encode("utf-8", "surrogateescape")
+        dirc_offsets.append(len(dirc_blob))
+
+    size_array = None
+    if sizes is not None:
+        size_array = array("Q", sizes)
+        if len(size_array) != count:
+            raise ValueError(
+                f"'sizes' must have one size per path, but got {len(size_array)} for {count}."
+            )
+
+    flags = (HAS_DIRCS if dircs else 0) | (HAS_SIZES if size_array is not None else 0)
+    if sys.byteorder == "big":
+        flags |= BIG_ENDIAN
+
+    tmp_path = f"{manifest_path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MANIFEST_MAGIC,
+                MANIFEST_VERSION,
+                flags,
+                count,
+                len(dirc_index),
+                len(blob),
+                len(dirc_blob),
+            )
+        )
+        sections = [offsets]
+        if dircs:
+            sections += [dirc_ids, dirc_offsets]
+        if size_array is not None:
+            sections.append(size_array)
+        sections.append(blob)
+        if dircs:
+            sections.append(dirc_blob)
+        for section in sections:
+            data = section.tobytes() if isinstance(section, array) else section
+            f.write(data)
+            f.write(_padding(len(data)))
+
+    os.replace(tmp_path, manifest_path)
+
+    return count
+
+
+class Manifest:
+    """Read-only, memory-mapped view of a manifest written by write_manifest().
+
+    Indexing costs two offset lookups & the decoding of one path; nothing is
+    loaded up front, so processes mapping the same file share its pages.
+    A Manifest is pickled as its path & mapped again when unpickled (e.g. in
+    data loader worker processes).
+    """
+
+    def __init__(self, manifest_path: str) -> None:
+        self.manifest_path = manifest_path
+
+        with open(manifest_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._map_sections()
+        except Exception:
+            self.close()
+            raise
+
+    def _map_sections(self) -> None:
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"'{self.manifest_path}' is not a manifest.")
+        (
+            magic,
+            version,
+            flags,
+            count,
+            dirc_count,
+            blob_size,
+            dirc_blob_size,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MANIFEST_MAGIC or version != MANIFEST_VERSION:
+            raise ValueError(f"'{self.manifest_path}' is not a manifest.")
+        if bool(flags & BIG_ENDIAN) != (sys.byteorder == "big"):
+            raise ValueError(
+                f"'{self.manifest_path}' was written in another byte order."
+            )
+
+        has_dircs = bool(flags & HAS_DIRCS)
+        has_sizes = bool(flags & HAS_SIZES)
+        sections = [
+            ("_offsets", 8 * (count + 1), "Q", True),
+            ("_dirc_ids", 4 * count, "I", has_dircs),
+            ("_dirc_offsets", 8 * (dirc_count + 1), "Q", has_dircs),
+            ("_sizes", 8 * count, "Q", has_sizes),
+            ("_blob", blob_size, "B", True),
+            ("_dirc_blob", dirc_blob_size, "B", has_dircs),
+        ]
+        end = HEADER.size + sum(
+            size + (-size % 8) for _, size, _, stored in sections if stored
+        )
+        if end > len(self._mmap):
+            raise ValueError(f"'{self.manifest_path}' is truncated.")
+
+        # views are only created once the layout is known to fit, so a failed
+        # open leaves no buffer export behind & the map can be closed
+        self._count = count
+        position = HEADER.size
+        with memoryview(self._mmap) as view:
+            for name, size, typecode, stored in sections:
+                if not stored:
+                    setattr(self, name, None)
+                    continue
+                with view[position : position + size] as data:
+                    setattr(self, name, data.cast(typecode))
+                position += size + (-size % 8)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("manifest index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return str(self._blob[start:end], "utf-8", "surrogateescape")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self[index]
+
+    def has_dircs(self) -> bool:
+        return self._dirc_ids is not None
+
+    def has_sizes(self) -> bool:
+        return self._sizes is not None
+
+    def dirc_id(self, index: int) -> int:
+        """Directory id of path 'index' (ids follow the first appearance order)."""
+        if self._dirc_ids is None:
+            raise ValueError("The manifest has no directory ids.")
+        return self._dirc_ids[index]
+
+    def dirc_path(self, dirc_id: int) -> str:
+        """Path of directory 'dirc_id'."""
+        if self._dirc_offsets is None:
+            raise ValueError("The manifest has no directory ids.")
+        start, end = self._dirc_offsets[dirc_id], self._dirc_offsets[dirc_id + 1]
+        return str(self._dirc_blob[start:end], "utf-8", "surrogateescape")
+
+    def size(self, index: int) -> int:
+        """Size in bytes of path 'index' when the manifest was written."""
+        if self._sizes is None:
+            raise ValueError("The manifest has no sizes.")
+        return self._sizes[index]
+
+    def item(self, index: int) -> Tuple[str, int | None, int | None]:
+        """(path, directory id, size) of 'index', None for what is not stored."""
+        return (
+            self[index],
+            None if self._dirc_ids is None else self._dirc_ids[index],
+            None if self._sizes is None else self._sizes[index],
+        )
+
+    def close(self) -> None:
+        """Unmap the manifest. Released views must not be used anymore."""
+        for name in (
+            "_offsets",
+            "_dirc_ids",
+            "_dirc_offsets",
+            "_sizes",
+            "_blob",
+            "_dirc_blob",
+        ):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+            setattr(self, name, None)
+        self._mmap.close()
+
+    def __enter__(self) -> Manifest:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        return {"manifest_path": self.manifest_path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["manifest_path"])
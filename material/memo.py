@@ -0,0 +1,103 @@
+"""Memoized query results for database collector"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+
+class TreeVersion:
+    """Mutation counter shared by every Directory instance of one structure."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def bump(self) -> None:
+        self.value += 1
+
+
+def conditions_fingerprint(conditions: Any) -> Hashable:
+    """Hashable fingerprint of a condition, a list or a dict of conditions.
+
+    Conditions contribute their fingerprint() & plain callables themselves,
+    so equal contents give equal fingerprints within one process.
+    """
+    if conditions is None:
+        return None
+    if isinstance(conditions, dict):
+        conditions = [conditions[k] for k in conditions]
+    if not isinstance(conditions, (list, tuple)):
+        conditions = [conditions]
+
+    return tuple(
+        condition.fingerprint() if hasattr(condition, "fingerprint") else condition
+        for condition in conditions
+    )
+
+
+def copy_nested(value: list) -> list:
+    """Copy a nested list of get_file_path() (strings are shared)."""
+    copy = []
+    stack = [(value, copy)]
+    while stack:
+        source, target = stack.pop()
+        for element in source:
+            if isinstance(element, list):
+                child = []
+                target.append(child)
+                stack.append((element, child))
+            else:
+                target.append(element)
+    return copy
+
+
+class QueryCache:
+    """Bounded LRU cache of query results.
+
+    Every entry remembers the structure & its TreeVersion value at the time
+    it was computed, & is dropped when either differs on lookup.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, database: Any) -> Any:
+        """Cached result of 'key' for the current version of 'database', if any."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                owner, version, result = entry
+                if owner is database and version == database.version:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, database: Any, version: int, result: Any) -> None:
+        """Store 'result' computed from 'database' at 'version'."""
+        with self._lock:
+            self.entries[key] = (database, version, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def info(self) -> Tuple[int, int, int]:
+        """(hits, misses, size)"""
+        return self.hits, self.misses, len(self.entries)
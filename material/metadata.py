@@ -0,0 +1,73 @@
+"""File metadata & metadata-based rules for database collector"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, NamedTuple
+
+FILE_TYPES = ("regular", "symlink")
+
+
+class FileMeta(NamedTuple):
+    """Metadata of one file, captured once while its directory is listed."""
+
+    size: int
+    mtime_ns: int
+    symlink: bool
+
+
+def entry_meta(entry: os.DirEntry) -> FileMeta:
+    """Get FileMeta of an os.scandir entry (symbolic links are followed for size & mtime)."""
+    stat = entry.stat()
+    return FileMeta(stat.st_size, stat.st_mtime_ns, entry.is_symlink())
+
+
+def stat_meta(path: str) -> FileMeta:
+    """Get FileMeta of 'path' from the filesystem, for files without captured metadata."""
+    stat = os.stat(path)
+    return FileMeta(stat.st_size, stat.st_mtime_ns, os.path.islink(path))
+
+
+def build_meta_check(condition: Any) -> Callable[..., bool] | None:
+    """Build the check of the size, mtime & file type rules of one Condition.
+
+    The returned function takes a file path (& optionally the ConditionContext
+    of its directory) & looks the metadata up in 'context.metadata' by file
+    name, issuing a stat only for files without captured metadata (counted
+    in 'context.stats' when given).
+
+    Returns:
+        Callable[..., bool]|None: None when the condition has no such rule.
+    """
+    if not condition.uses_metadata():
+        return None
+
+    min_size, max_size = condition.size_range or (None, None)
+    min_mtime, max_mtime = (
+        None if mtime is None else int(mtime * 1e9)
+        for mtime in condition.mtime_range or (None, None)
+    )
+    file_type = frozenset(condition.file_type)
+
+    def meta_check(file_path: str, context: Any = None) -> bool:
+        meta = None
+        if context is not None and context.metadata is not None:
+            meta = context.metadata.get(os.path.basename(file_path))
+        if meta is None:
+            meta = stat_meta(file_path)
+            if context is not None and context.stats is not None:
+                context.stats.add_fs_calls()
+
+        if min_size is not None and meta.size < min_size:
+            return False
+        if max_size is not None and meta.size > max_size:
+            return False
+        if min_mtime is not None and meta.mtime_ns < min_mtime:
+            return False
+        if max_mtime is not None and meta.mtime_ns > max_mtime:
+            return False
+        if file_type:
+            return ("symlink" if meta.symlink else "regular") in file_type
+        return True
+
+    return meta_check
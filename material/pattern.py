@@ -0,0 +1,256 @@
+"""Name & path pattern matchers for database collector"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+from typing import Any, Callable, FrozenSet, Iterable, List, Tuple
+
+# path pattern segment matching any number of path components
+RECURSIVE = "**"
+
+
+def has_magic(name: str) -> bool:
+    """Whether 'name' contains glob special characters ('*', '?', '[')."""
+    return re.search(r"[*?[]", name) is not None
+
+
+class NameMatcher:
+    """Match names against literal names & glob-style patterns.
+
+    'names' are compared exactly through a set (even when they contain glob
+    special characters), 'patterns' are compiled together into one regex.
+    """
+
+    def __init__(self, names: List[str], patterns: List[str] = ()) -> None:
+        self.literals = frozenset(names)
+        self.regex = None
+        if patterns:
+            regex = "|".join(fnmatch.translate(pattern) for pattern in patterns)
+            self.regex = re.compile(regex).match
+
+    def __bool__(self) -> bool:
+        return bool(self.literals) or self.regex is not None
+
+    def match(self, name: str) -> bool:
+        """Whether 'name' matches any entry."""
+        if name in self.literals:
+            return True
+        return self.regex is not None and self.regex(name) is not None
+
+    def match_any(self, names: Iterable[str]) -> bool:
+        """Whether any of 'names' matches any entry."""
+        if not self.literals.isdisjoint(names):
+            return True
+        if self.regex is None:
+            return False
+        for name in names:
+            if self.regex(name) is not None:
+                return True
+        return False
+
+
+def split_path(path: str) -> List[str]:
+    """Split a path into components. An absolute path starts with the separator
+    as its own component, '.' & empty components are dropped."""
+    path = path.replace("\\", "/") if os.sep == "\\" else path
+    components = [name for name in path.split("/") if name not in ("", ".")]
+    if path.startswith("/"):
+        components.insert(0, "/")
+    return components
+
+
+def compile_segment(segment: str, regex: bool) -> str | Callable[[str], Any]:
+    """Compile one path pattern segment into a literal name, RECURSIVE or a match function."""
+    if segment == RECURSIVE:
+        return RECURSIVE
+    if regex:
+        return re.compile(segment).fullmatch
+    if not has_magic(segment):
+        return segment
+    return re.compile(fnmatch.translate(segment)).match
+
+
+class PathMatcher:
+    """Match paths against glob & regex path patterns, component by component.
+
+    Patterns are split at '/' into segments, each matching one path component:
+    a glob ('*', '?', '[...]') or, for regex patterns, a regex matching the
+    whole component. A '**' segment matches any number of components.
+    A pattern matches the whole path as given (e.g. 'data/train/*/*.wav' for
+    the root path 'data'), '**/' in front matches at any depth.
+
+    The patterns work as one automaton whose state is the set of
+    (pattern, segment) positions reached. The state of a directory is derived
+    from the state of its parent & cached by directory path, so a file only
+    costs one lookup & a match of its own name, & a directory whose state is
+    empty can be skipped with its whole subtree.
+    """
+
+    def __init__(self, globs: List[str] = (), regexes: List[str] = ()) -> None:
+        self.globs = list(globs)
+        self.regexes = list(regexes)
+        self.patterns = [
+            tuple(compile_segment(segment, False) for segment in split_path(glob))
+            for glob in self.globs
+        ] + [
+            tuple(
+                compile_segment(segment, True)
+                for segment in (["/"] if regex.startswith("/") else [])
+                + [name for name in regex.split("/") if name != ""]
+            )
+            for regex in self.regexes
+        ]
+
+        # whether only '**' segments follow each position
+        self._tail = [
+            [
+                all(segment is RECURSIVE for segment in segments[i:])
+                for i in range(len(segments) + 1)
+            ]
+            for segments in self.patterns
+        ]
+        self._start = self.closure((pattern, 0) for pattern in range(len(self)))
+        self._states = {}
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __bool__(self) -> bool:
+        return self.patterns != []
+
+    def __getstate__(self) -> dict:
+        # the directory state cache is rebuilt on demand (e.g. in worker processes)
+        return {"globs": self.globs, "regexes": self.regexes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["globs"], state["regexes"])
+
+    def closure(self, states: Iterable[Tuple[int, int]]) -> FrozenSet[Tuple[int, int]]:
+        """Add the positions reached by skipping '**' segments."""
+        closed = set()
+        for pattern, position in states:
+            segments = self.patterns[pattern]
+            closed.add((pattern, position))
+            while position < len(segments) and segments[position] is RECURSIVE:
+                position += 1
+                closed.add((pattern, position))
+        return frozenset(closed)
+
+    def step(
+        self, states: FrozenSet[Tuple[int, int]], name: str
+    ) -> FrozenSet[Tuple[int, int]]:
+        """State after the component 'name'."""
+        reached = []
+        for pattern, position in states:
+            segments = self.patterns[pattern]
+            if position == len(segments):
+                continue
+            segment = segments[position]
+            if segment is RECURSIVE:
+                reached.append((pattern, position))
+            elif segment == name if isinstance(segment, str) else segment(name):
+                reached.append((pattern, position + 1))
+        return self.closure(reached)
+
+    def dirc_states(self, dirc_path: str) -> FrozenSet[Tuple[int, int]]:
+        """State after the components of 'dirc_path' (cached by path)."""
+        states = self._states.get(dirc_path)
+        if states is not None:
+            return states
+
+        # climb to the nearest known ancestor, then step back down
+        names = []
+        path = dirc_path
+        while states is None:
+            if path == "":
+                states = self._start
+                break
+            if path == os.sep:
+                head, name = "", "/"
+            else:
+                head, sep, name = path.rpartition(os.sep)
+                if sep and head == "":
+                    head = os.sep
+            names.append((path, name))
+            path = head
+            states = self._states.get(path)
+
+        for path, name in reversed(names):
+            if name not in ("", "."):
+                states = self.step(states, name)
+            self._states[path] = states
+
+        return states
+
+    def match(self, file_path: str) -> bool:
+        """Whether 'file_path' (separated by os.sep) matches any pattern."""
+        dirs_path, _, file_name = file_path.rpartition(os.sep)
+        if dirs_path == "" and file_path.startswith(os.sep):
+            dirs_path = os.sep
+        for pattern, position in self.dirc_states(dirs_path):
+            segments = self.patterns[pattern]
+            if position == len(segments):
+                continue
+            segment = segments[position]
+            if segment is RECURSIVE:
+                matched = self._tail[pattern][position]
+            elif (
+                segment == file_name if isinstance(segment, str) else segment(file_name)
+            ):
+                matched = self._tail[pattern][position + 1]
+            else:
+                matched = False
+            if matched:
+                return True
+        return False
+
+    def prunes(self, dirc_path: str) -> bool:
+        """Whether no file in or below 'dirc_path' can match."""
+        for pattern, position in self.dirc_states(dirc_path):
+            if position < len(self.patterns[pattern]):
+                return False
+        return True
+
+
+class DircPruner:
+    """Directory predicate matching directories excluded by every condition.
+
+    Holds one NameMatcher (None for conditions without exclusions) & one
+    PathMatcher (None for conditions without path patterns) per condition.
+    Called with a directory name, only the exclusions are checked; walks use
+    prune_dirc(), which also gives the path. Unlike bound methods of
+    CompiledCondition, it can be pickled.
+    """
+
+    def __init__(
+        self,
+        excluders: List[NameMatcher | None],
+        path_matchers: List[PathMatcher | None] = None,
+    ) -> None:
+        self.excluders = excluders
+        if path_matchers is None:
+            path_matchers = [None] * len(excluders)
+        self.path_matchers = path_matchers
+
+    def __call__(self, dirc_name: str, dirc_path: str = None) -> bool:
+        if self.excluders == []:
+            return False
+        for excluder, path_matcher in zip(self.excluders, self.path_matchers):
+            if excluder is not None and excluder.match(dirc_name):
+                continue
+            if dirc_path is not None and path_matcher is not None:
+                if path_matcher.prunes(dirc_path):
+                    continue
+            return False
+        return True
+
+
+def prune_dirc(prune: Callable[..., bool], dirc_path: str) -> bool:
+    """Apply a directory predicate of the walks to 'dirc_path'.
+    DircPruner also checks path patterns, other predicates get the directory name."""
+    dirc_name = os.path.basename(dirc_path)
+    if isinstance(prune, DircPruner):
+        return prune(dirc_name, dirc_path)
+    return prune(dirc_name)
@@ -0,0 +1,126 @@
+"""On-disk snapshot of Directory structure for database collector"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+
+from .directory import Directory
+
+SNAPSHOT_VERSION = 2
+
+
+def save_snapshot(directory: Directory, snapshot_path: str) -> None:
+    """Save Directory structure to a SQLite snapshot file.
+
+    The file is written to a temporary path first & moved into place,
+    so a reader never sees a half written snapshot. File metadata (file_meta)
+    is not saved: rewriting a file keeps the mtime of its directory, so it could
+    not be validated when the snapshot is loaded.
+
+    Args:
+        directory (Directory): Root of the structure to be saved.
+        snapshot_path (str): Output snapshot file path.
+    """
+    tmp_path = f"{snapshot_path}.tmp{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    dirc_rows = []
+    file_rows = []
+    stack = [(directory, None)]
+    while stack:
+        dirc, parent_id = stack.pop()
+        dirc_id = len(dirc_rows)
+        dirc_rows.append(
+            (
+                dirc_id,
+                parent_id,
+                dirc.name,
+                dirc.mtime,
+                int(dirc.terminal),
+                int(dirc.pruned),
+            )
+        )
+        file_rows += [(dirc_id, os.path.basename(file)) for file in dirc.file_member]
+        stack += [(child, dirc_id) for child in reversed(dirc.dirc_member)]
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE dirc (
+                id INTEGER PRIMARY KEY, parent INTEGER, name TEXT,
+                mtime INTEGER, terminal INTEGER, pruned INTEGER
+            );
+            CREATE TABLE file (dirc INTEGER, name TEXT);
+            """)
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("version", str(SNAPSHOT_VERSION)),
+                ("abspath", directory.abspath),
+                ("empty", str(int(directory.empty))),
+            ],
+        )
+        conn.executemany("INSERT INTO dirc VALUES (?, ?, ?, ?, ?, ?)", dirc_rows)
+        conn.executemany("INSERT INTO file VALUES (?, ?)", file_rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, snapshot_path)
+
+
+def load_snapshot(
+    snapshot_path: str, root_path: str, empty: bool = False
+) -> Directory | None:
+    """Load Directory structure from a snapshot file without validating it.
+
+    Args:
+        snapshot_path (str): Snapshot file path.
+        root_path (str): Root path of the structure, as given to Directory().
+        empty (bool, optional): Expected 'empty' flag of the root. Defaults to False.
+
+    Returns:
+        Directory|None: None when the snapshot is missing, broken or was taken for another root.
+    """
+    if not os.path.isfile(snapshot_path):
+        return None
+
+    root = Directory(root_path, empty)
+
+    conn = sqlite3.connect(snapshot_path)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        if (
+            meta.get("version") != str(SNAPSHOT_VERSION)
+            or meta.get("abspath") != root.abspath
+            or meta.get("empty") != str(int(empty))
+        ):
+            return None
+
+        nodes = []
+        for _, parent_id, name, mtime, terminal, pruned in conn.execute(
+            "SELECT id, parent, name, mtime, terminal, pruned FROM dirc ORDER BY id"
+        ):
+            if parent_id is None:
+                dirc = root
+            else:
+                parent = nodes[parent_id]
+                dirc = parent.new_member(name, empty)
+                parent.dirc_member.append(dirc)
+            dirc.mtime = mtime
+            dirc.terminal = bool(terminal)
+            dirc.pruned = bool(pruned)
+            nodes.append(dirc)
+
+        for dirc_id, name in conn.execute("SELECT dirc, name FROM file ORDER BY rowid"):
+            dirc = nodes[dirc_id]
+            dirc.file_member.append(os.path.join(dirc.path, name))
+    except (sqlite3.DatabaseError, IndexError):
+        return None
+    finally:
+        conn.close()
+
+    return root
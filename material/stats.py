@@ -0,0 +1,128 @@
+"""Walk & query instrumentation for database collector"""
+
+from __future__ import annotations
+
+import contextlib
+import heapq
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+
+class WalkStats:
+    """Counters, phase timings & the slowest directories of walks & queries.
+
+    Pass an instance as 'stats' to Collector / Directory to enable it; nothing
+    is recorded (& nothing is paid for) otherwise.
+
+    'callback' is called as callback(event, stats, value) with event "dirc"
+    (value: the listed directory path) after every listing & "phase" (value:
+    the phase name) after every phase. "dirc" events come from the listing
+    threads when several workers are used.
+    """
+
+    def __init__(
+        self,
+        top_n: int = 10,
+        callback: Callable[[str, WalkStats, Any], Any] = None,
+    ) -> None:
+        self.top_n = top_n
+        self.callback = callback
+
+        self.dircs_listed = 0
+        self.entries_seen = 0
+        self.fs_calls = 0
+        self.condition_evals = 0
+        self.phase_seconds = {}
+        self.slowest = []
+
+        self._lock = threading.Lock()
+
+    def add_listing(
+        self,
+        path: str,
+        listing: Tuple[List[str], List[str], Any],
+        seconds: float = None,
+    ) -> None:
+        """Record one directory listing (a stat & a scandir, plus a stat per file
+        when it captured file metadata) which took 'seconds'."""
+        entries = len(listing[0]) + len(listing[1])
+        fs_calls = 2 if len(listing) < 4 else 2 + len(listing[3])
+        with self._lock:
+            self.dircs_listed += 1
+            self.entries_seen += entries
+            self.fs_calls += fs_calls
+            if seconds is not None and self.top_n > 0:
+                if len(self.slowest) < self.top_n:
+                    heapq.heappush(self.slowest, (seconds, path))
+                else:
+                    heapq.heappushpop(self.slowest, (seconds, path))
+        if self.callback is not None:
+            self.callback("dirc", self, path)
+
+    def add_fs_calls(self, number: int = 1) -> None:
+        """Record filesystem calls issued outside of listings (e.g. stale checks)."""
+        with self._lock:
+            self.fs_calls += number
+
+    def add_condition_evals(self, number: int) -> None:
+        """Record 'number' file condition evaluations."""
+        self.condition_evals += number
+
+    def timed(self, scanner: Callable[[str], Any]) -> Callable[[str], Any]:
+        """Wrap a directory listing function to record every call."""
+
+        def timed_scanner(path: str) -> Any:
+            start = time.perf_counter()
+            listing = scanner(path)
+            self.add_listing(path, listing, time.perf_counter() - start)
+            return listing
+
+        return timed_scanner
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[WalkStats]:
+        """Add the time spent in the 'with' block to phase 'name'."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            seconds = time.perf_counter() - start
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+            if self.callback is not None:
+                self.callback("phase", self, name)
+
+    def slowest_dircs(self) -> List[Tuple[str, float]]:
+        """(path, seconds) of the slowest listed directories, slowest first."""
+        return [(path, seconds) for seconds, path in sorted(self.slowest, reverse=True)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON serializable summary."""
+        return {
+            "dircs_listed": self.dircs_listed,
+            "entries_seen": self.entries_seen,
+            "fs_calls": self.fs_calls,
+            "condition_evals": self.condition_evals,
+            "phase_seconds": dict(self.phase_seconds),
+            "slowest_dircs": self.slowest_dircs(),
+        }
+
+    def __str__(self) -> str:
+        out_str = (
+            f"dircs listed: {self.dircs_listed}\n"
+            f"entries seen: {self.entries_seen}\n"
+            f"fs calls: {self.fs_calls}\n"
+            f"condition evals: {self.condition_evals}\n"
+        )
+        for name, seconds in self.phase_seconds.items():
+            out_str += f"phase {name}: {seconds:.3f} s\n"
+        for path, seconds in self.slowest_dircs():
+            out_str += f"slow dirc: {path} ({seconds:.3f} s)\n"
+        return out_str
+
+
+def phase(stats: WalkStats | None, name: str) -> contextlib.AbstractContextManager:
+    """stats.phase(name), or a no-op context when 'stats' is None."""
+    if stats is None:
+        return contextlib.nullcontext()
+    return stats.phase(name)
@@ -0,0 +1,234 @@
+"""Parallel file transfer & removal for database collector"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, List, Tuple
+
+COPY_MODES = ("copy", "hardlink", "symlink")
+
+CHUNK_SIZE = 1 << 30
+
+# files removed by one task of remove_files()
+REMOVE_BATCH_SIZE = 256
+
+
+class CopyProgress:
+    """Aggregated progress of transfer_files()"""
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+        self.bytes = 0
+
+    def __str__(self) -> str:
+        return f"{self.done}/{self.total} files, {self.bytes} bytes"
+
+
+class RemoveSummary:
+    """Result of remove_files(). With 'dry_run', 'removed' lists the files
+    which would have been removed."""
+
+    def __init__(self, dry_run: bool = False) -> None:
+        self.dry_run = dry_run
+        self.removed = []
+        self.failed = []
+
+    def __len__(self) -> int:
+        return len(self.removed)
+
+    def __str__(self) -> str:
+        label = "to be removed" if self.dry_run else "removed"
+        return f"{len(self.removed)} files {label}, {len(self.failed)} failed"
+
+
+def kernel_copy(src: str, dst: str) -> int:
+    """Copy file contents inside the kernel when possible.
+
+    os.copy_file_range is tried first (it may share extents or offload the copy
+    on filesystems supporting it), then os.sendfile, then a user-space copy.
+
+    Raises:
+        shutil.SameFileError: 'dst' is 'src' (itself, a link to it or a directory
+            copied onto itself), which opening 'dst' for writing would truncate.
+
+    Returns:
+        int: Number of copied bytes.
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"'{src}' and '{dst}' are the same file")
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        for name in ("copy_file_range", "sendfile"):
+            if not hasattr(os, name):
+                continue
+            try:
+                copied = 0
+                while copied < size:
+                    if name == "copy_file_range":
+                        sent = os.copy_file_range(
+                            fsrc.fileno(), fdst.fileno(), CHUNK_SIZE
+                        )
+                    else:
+                        sent = os.sendfile(
+                            fdst.fileno(), fsrc.fileno(), copied, CHUNK_SIZE
+                        )
+                    if sent == 0:
+                        break
+                    copied += sent
+                return copied
+            except OSError:
+                # not supported between these files, retry from the start
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst)
+        return fdst.tell()
+
+
+def transfer_one(src: str, dst: str, mode: str = "copy", override: bool = False) -> int:
+    """Transfer one file with 'mode' ("copy", "hardlink" or "symlink").
+
+    Returns:
+        int: Number of copied bytes (0 for links).
+    """
+    if mode == "copy":
+        if override and os.path.lexists(dst):
+            if os.path.exists(dst) and os.path.samefile(src, dst):
+                raise shutil.SameFileError(f"'{src}' and '{dst}' are the same file")
+            # write a new file instead of through a link to another one
+            if os.path.islink(dst) or os.lstat(dst).st_nlink > 1:
+                os.remove(dst)
+        return kernel_copy(src, dst)
+
+    if override and os.path.lexists(dst):
+        os.remove(dst)
+    if mode == "hardlink":
+        os.link(src, dst)
+    elif mode == "symlink":
+        os.symlink(os.path.abspath(src), dst)
+    else:
+        raise ValueError(f"'mode' must be one of {COPY_MODES}, but got '{mode}'.")
+    return 0
+
+
+def transfer_files(
+    jobs: List[Tuple[str, str]],
+    mode: str = "copy",
+    workers: int = 1,
+    override: bool = False,
+    progress: Callable[[CopyProgress], Any] = None,
+) -> CopyProgress:
+    """Transfer (source, target) file pairs on a pool of 'workers' threads.
+
+    Args:
+        jobs (List[Tuple[str, str]]): (source path, target path) pairs.
+        mode (str, optional): "copy", "hardlink" or "symlink". Defaults to "copy".
+        workers (int, optional): Number of transfer threads. Defaults to 1.
+        override (bool, optional): Replace existing targets; links are replaced, not
+            written through. Defaults to False.
+        progress (Callable[[CopyProgress], Any], optional): Called after every finished file.
+
+    Returns:
+        CopyProgress: Final progress.
+    """
+    if mode not in COPY_MODES:
+        raise ValueError(f"'mode' must be one of {COPY_MODES}, but got '{mode}'.")
+
+    state = CopyProgress(len(jobs))
+
+    def finish(src: str, dst: str, size: int):
+        state.done += 1
+        state.bytes += size
+        if progress is not None:
+            progress(state)
+
+    if workers <= 1:
+        for src, dst in jobs:
+            finish(src, dst, transfer_one(src, dst, mode, override))
+        return state
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(transfer_one, src, dst, mode, override): (src, dst)
+            for src, dst in jobs
+        }
+        for future in as_completed(futures):
+            src, dst = futures[future]
+            finish(src, dst, future.result())
+
+    return state
+
+
+def remove_batch(paths: List[str]) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Remove 'paths' one after another. Files which are already gone count as removed.
+
+    Returns:
+        Tuple[List[str], List[Tuple[str, str]]]: Removed paths & (path, error) pairs.
+    """
+    removed = []
+    failed = []
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            removed.append(path)
+        except OSError as err:
+            failed.append((path, str(err)))
+        else:
+            removed.append(path)
+    return removed, failed
+
+
+def remove_files(
+    batches: List[List[str]],
+    workers: int = 1,
+    dry_run: bool = False,
+    on_batch: Callable[[int, List[str]], Any] = None,
+) -> RemoveSummary:
+    """Remove batches of files on a pool of 'workers' threads, one task per batch.
+
+    Files of one batch should share their directory, so that concurrent
+    removals do not contend on the same directory.
+
+    Args:
+        batches (List[List[str]]): Paths to be removed, in batches.
+        workers (int, optional): Number of removing threads. Defaults to 1.
+        dry_run (bool, optional): Remove nothing, only report. Defaults to False.
+        on_batch (Callable[[int, List[str]], Any], optional): Called in the caller's
+            thread with the index & the removed paths of every finished batch.
+
+    Returns:
+        RemoveSummary: Removed & failed paths.
+    """
+    summary = RemoveSummary(dry_run)
+
+    def finish(index: int, removed: List[str], failed: List[Tuple[str, str]]):
+        summary.removed += removed
+        summary.failed += failed
+        if on_batch is not None:
+            on_batch(index, removed)
+
+    if dry_run:
+        for batch in batches:
+            summary.removed += batch
+        return summary
+
+    if workers <= 1:
+        for index, batch in enumerate(batches):
+            finish(index, *remove_batch(batch))
+        return summary
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(remove_batch, batch): index
+            for index, batch in enumerate(batches)
+        }
+        for future in as_completed(futures):
+            finish(futures[future], *future.result())
+
+    return summary
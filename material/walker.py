@@ -0,0 +1,248 @@
+"""Directory walker for database collector"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Tuple
+
+from .metadata import FileMeta, entry_meta
+from .pattern import prune_dirc
+
+
+def scan_dirc(path: str) -> Tuple[List[str], List[str], int]:
+    """List 'path' once & split its member names into (files, directories, mtime).
+
+    The file type is taken from the os.scandir entry, so no extra stat is
+    issued per member except for symbolic links. 'mtime' is the st_mtime_ns
+    of 'path' itself, taken before listing.
+    """
+    file_names = []
+    dirc_names = []
+    mtime = os.stat(path).st_mtime_ns
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                file_names.append(entry.name)
+            else:
+                dirc_names.append(entry.name)
+
+    return file_names, dirc_names, mtime
+
+
+def scan_dirc_meta(path: str) -> Tuple[List[str], List[str], int, Dict[str, FileMeta]]:
+    """scan_dirc() which also captures FileMeta of every file from its os.scandir entry.
+
+    This costs one stat per file where the platform does not return it with
+    the listing, but the metadata never has to be looked up again.
+    """
+    file_names = []
+    dirc_names = []
+    file_meta = {}
+    mtime = os.stat(path).st_mtime_ns
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                file_names.append(entry.name)
+                file_meta[entry.name] = entry_meta(entry)
+            else:
+                dirc_names.append(entry.name)
+
+    return file_names, dirc_names, mtime, file_meta
+
+
+def walk(
+    node: Any,
+    path: Any,
+    visit: Callable[[Any, Any], List[Tuple[Any, str]]],
+    workers: int = 1,
+    scanner: Callable[[str], Any] = scan_dirc,
+) -> None:
+    """Walk a directory tree, listing directories on a pool of 'workers' threads.
+
+    Args:
+        node (Any): Object which represents 'path' (e.g. Directory instance).
+        path (Any): Argument of 'scanner' for 'node', the directory path by default.
+        visit (Callable): Called in the caller's thread as visit(node, listing)
+            with the result of 'scanner'. Must return the (child_node, child_path)
+            pairs which should be listed next.
+        workers (int, optional): Number of listing threads. Defaults to 1.
+        scanner (Callable, optional): Directory listing function. Defaults to scan_dirc.
+    """
+    if workers <= 1:
+        stack = [(node, path)]
+        while stack:
+            node, path = stack.pop()
+            children = visit(node, scanner(path))
+            stack += reversed(children)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(scanner, path): node}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = pending.pop(future)
+                for child, child_path in visit(node, future.result()):
+                    pending[executor.submit(scanner, child_path)] = child
+
+
+def scan_subtree(
+    path: str,
+    prune: Callable[[str], bool] = None,
+    scanner: Callable[[str], Any] = scan_dirc,
+) -> List[Any]:
+    """List every directory of the subtree of 'path' in depth-first pre-order.
+
+    Directories whose name matches 'prune' are reported but not entered.
+    Runs in a worker process of shard_walk(), so only raw listings are returned.
+
+    Returns:
+        List[Any]: Results of 'scanner', 'path' first.
+    """
+    listings = []
+    stack = [path]
+    while stack:
+        path = stack.pop()
+        listing = scanner(path)
+        listings.append(listing)
+        stack += [
+            dirc_path
+            for dirc_path in (
+                os.path.join(path, dirc_name) for dirc_name in reversed(listing[1])
+            )
+            if prune is None or not prune_dirc(prune, dirc_path)
+        ]
+
+    return listings
+
+
+def shard_walk(
+    node: Any,
+    path: str,
+    visit: Callable[[Any, Any], List[Tuple[Any, str]]],
+    processes: int,
+    prune: Callable[[str], bool] = None,
+    scanner: Callable[[str], Any] = scan_dirc,
+) -> None:
+    """Walk a directory tree, listing each top-level subtree in a pool of 'processes'.
+
+    'path' is listed in the caller, every child returned by visit() is listed
+    as a whole by scan_subtree() in a worker process & the listings are
+    replayed through visit() in the caller. 'visit' must return exactly the
+    children not matching 'prune', which (like 'scanner') has to be picklable.
+
+    Args:
+        node (Any): Object which represents 'path' (e.g. Directory instance).
+        path (str): Root directory path.
+        visit (Callable): Same as walk().
+        processes (int): Number of listing processes.
+        prune (Callable[[str], bool], optional): Directory-name predicate. Defaults to None.
+        scanner (Callable, optional): Directory listing function. Defaults to scan_dirc.
+    """
+    children = visit(node, scanner(path))
+    if children == []:
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            (child, executor.submit(scan_subtree, child_path, prune, scanner))
+            for child, child_path in children
+        ]
+        for child, future in futures:
+            listings = iter(future.result())
+            stack = [child]
+            while stack:
+                node = stack.pop()
+                grandchildren = visit(node, next(listings))
+                stack += [grandchild for grandchild, _ in reversed(grandchildren)]
+
+
+def iter_walk(
+    path: str,
+    scanner: Callable[[str], Any] = scan_dirc,
+    prune: Callable[[str], bool] = None,
+) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """Lazily walk a directory tree in depth-first pre-order.
+
+    Only the paths of directories waiting to be listed are held in memory.
+    Directories whose name matches 'prune' are reported but not entered.
+
+    Yields:
+        Tuple[str, List[str], List[str]]: (path, file names, directory names)
+    """
+    stack = [path]
+    while stack:
+        path = stack.pop()
+        file_names, dirc_names, _ = scanner(path)
+        yield path, file_names, dirc_names
+        stack += [
+            dirc_path
+            for dirc_path in (
+                os.path.join(path, dirc_name) for dirc_name in reversed(dirc_names)
+            )
+            if prune is None or not prune_dirc(prune, dirc_path)
+        ]
+
+
+async def aiter_walk(
+    node: Any,
+    path: Any,
+    visit: Callable[[Any, Any], List[Tuple[Any, str]]],
+    concurrency: int = 16,
+    scanner: Callable[[str], Any] = scan_dirc,
+) -> AsyncIterator[Tuple[Any, Any]]:
+    """Walk a directory tree from asyncio, keeping up to 'concurrency' listings in flight.
+
+    Listings run on a thread pool so the event loop is never blocked.
+    Directories are visited in completion order, not in pre-order.
+
+    Args:
+        node (Any): Object which represents 'path' (e.g. Directory instance).
+        path (Any): Argument of 'scanner' for 'node', the directory path by default.
+        visit (Callable): Same as walk(), called in the event loop.
+        concurrency (int, optional): Maximum number of listings in flight. Defaults to 16.
+        scanner (Callable, optional): Directory listing function. Defaults to scan_dirc.
+
+    Yields:
+        Tuple[Any, Any]: (node, listing) after 'node' was visited.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    waiting = deque([(node, path)])
+    pending = {}
+    try:
+        while waiting or pending:
+            while waiting and len(pending) < concurrency:
+                node, path = waiting.popleft()
+                pending[loop.run_in_executor(executor, scanner, path)] = node
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                node = pending.pop(future)
+                listing = future.result()
+                waiting += visit(node, listing)
+                yield node, listing
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def async_walk(
+    node: Any,
+    path: Any,
+    visit: Callable[[Any, Any], List[Tuple[Any, str]]],
+    concurrency: int = 16,
+    scanner: Callable[[str], Any] = scan_dirc,
+) -> None:
+    """Walk a directory tree like walk() without blocking the event loop.
+    See aiter_walk() for the arguments."""
+    async for _ in aiter_walk(node, path, visit, concurrency, scanner):
+        pass
@@ -0,0 +1,416 @@
+"""Live watch of a Directory structure for database collector"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import traceback
+from typing import Any, Callable, List
+
+from .compact import CompactDirectory
+from .directory import ChangeReport, Condition, Directory, compile_conditions
+from .metadata import stat_meta
+from .pattern import prune_dirc
+from .walker import scan_dirc, scan_dirc_meta, walk
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal ctypes binding of the Linux inotify API."""
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Watch directory 'path' & return its watch descriptor."""
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        """Stop watching 'wd' (ignored when it is already gone)."""
+        self._rm_watch(self.fd, wd)
+
+    def read(self, timeout: float) -> List[tuple]:
+        """Wait up to 'timeout' seconds & return (wd, mask, cookie, name) events."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buffer = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, cookie, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Watcher:
+    """Keep a Directory structure in sync with the filesystem.
+
+    On Linux the directories are watched with inotify & every change is
+    applied to the affected instance only; elsewhere (or when inotify is not
+    usable, e.g. out of watches) the structure is refreshed every
+    'poll_interval' seconds.
+
+    'callback' is called with the path of every new file matching the
+    conditions & 'on_remove' with every removed one. Files created in place
+    are reported once they are closed after writing, moved-in files at once.
+    Callbacks run in the watch thread while holding 'lock'; take 'lock' to
+    query the structure from other threads. An exception raised by a callback
+    is passed to 'on_error' (printed when it is None) & watching goes on.
+
+    A failed refresh (e.g. a directory removed while it was listed, or the
+    root itself removed) is kept in 'error' & passed to 'on_error', then
+    retried after 'poll_interval' seconds; inotify falls back to polling.
+    """
+
+    def __init__(
+        self,
+        directory: Directory,
+        conditions: List[Condition] = None,
+        callback: Callable[[str], Any] = None,
+        on_remove: Callable[[str], Any] = None,
+        poll_interval: float = 1.0,
+        prune: Callable[[str], bool] = None,
+        backend: str = "auto",
+        on_error: Callable[[Exception], Any] = None,
+    ) -> None:
+        """
+        Args:
+            directory (Directory): Built structure to be kept in sync.
+            conditions (List[Condition], optional): Conditions of the reported files.
+                Every file is reported when None. Defaults to None.
+            callback (Callable[[str], Any], optional): Called with new matching files.
+            on_remove (Callable[[str], Any], optional): Called with removed matching files.
+            poll_interval (float, optional): Seconds between refreshes of the polling
+                backend. Defaults to 1.0.
+            prune (Callable[[str], bool], optional): Directory-name predicate, new
+                matching directories are kept unlisted. Defaults to None.
+            backend (str, optional): "auto", "inotify" or "poll". Defaults to "auto".
+            on_error (Callable[[Exception], Any], optional): Called in the watch thread
+                with every error of a refresh, of inotify or of a callback.
+                Defaults to None.
+        """
+        if isinstance(directory, CompactDirectory):
+            raise TypeError("A compact structure is read-only & cannot be watched.")
+        if backend not in ("auto", "inotify", "poll"):
+            raise ValueError(
+                f"'backend' must be 'auto', 'inotify' or 'poll', but got '{backend}'."
+            )
+
+        self.directory = directory
+        self.conditions = compile_conditions(conditions)
+        self.callback = callback
+        self.on_remove = on_remove
+        self.poll_interval = poll_interval
+        self.prune = prune
+        self.backend = backend
+        self.on_error = on_error
+        self.error = None
+        # refreshes keep file metadata when the structure holds or needs it
+        self.metadata = directory.file_meta is not None or (
+            self.conditions is not None and self.conditions.uses_metadata()
+        )
+
+        self.lock = threading.RLock()
+        self.inotify = None
+        self.watches = {}
+        self.pending = set()
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> Watcher:
+        """Start watching in a background thread."""
+        if self._thread is not None:
+            raise RuntimeError("Watcher is already started.")
+
+        if self.backend != "poll":
+            try:
+                self.inotify = Inotify()
+                with self.lock:
+                    self.watch_tree(self.directory)
+                    # catch up with the changes made before the watches were set
+                    self.notify_report(
+                        self.directory.refresh(prune=self.prune, metadata=self.metadata)
+                    )
+                    self.watch_tree(self.directory)
+            except Exception as err:
+                self.close_inotify()
+                if self.backend == "inotify" or not isinstance(err, OSError):
+                    raise
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self) -> None:
+        """Stop watching & wait for the watch thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.close_inotify()
+
+    def __enter__(self) -> Watcher:
+        if self._thread is None:
+            self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    def run(self) -> None:
+        """Body of the watch thread."""
+        while not self._stop.is_set():
+            try:
+                if self.inotify is not None:
+                    events = self.inotify.read(0.2)
+                    if events:
+                        with self.lock:
+                            self.apply_events(events)
+                    continue
+                self.poll()
+                self.error = None
+            except OSError as err:
+                self.fail(err)
+            self._stop.wait(self.poll_interval)
+
+    def fail(self, err: OSError) -> None:
+        """Keep & report 'err'. inotify is given up (e.g. out of watches), the
+        next poll refreshes whatever changed meanwhile."""
+        self.error = err
+        self.close_inotify()
+        if self.on_error is not None:
+            self.on_error(err)
+
+    def poll(self) -> ChangeReport:
+        """Refresh the structure once & report the changes."""
+        with self.lock:
+            report = self.directory.refresh(prune=self.prune, metadata=self.metadata)
+            self.notify_report(report)
+        return report
+
+    def close_inotify(self) -> None:
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+        self.watches = {}
+        self.pending = set()
+
+    def matches(self, dirc: Directory | None, file_path: str) -> bool:
+        """Whether 'file_path' of 'dirc' matches the conditions."""
+        if self.conditions is None:
+            return True
+        context = dirc.get_context() if dirc is not None else None
+        return self.conditions(file_path, context)
+
+    def notify(self, dirc: Directory | None, file_path: str, removed: bool = False):
+        """Call the callback of 'file_path' if it matches the conditions."""
+        callback = self.on_remove if removed else self.callback
+        if callback is not None and self.matches(dirc, file_path):
+            try:
+                callback("/".join(file_path.split(os.sep)))
+            except Exception as err:
+                # a failing callback must not stop the watch thread
+                if self.on_error is None:
+                    traceback.print_exc()
+                else:
+                    self.on_error(err)
+
+    def notify_report(self, report: ChangeReport) -> None:
+        """Report the files of a ChangeReport of refresh()."""
+        root = self.directory
+        for file_path in report.added_files:
+            route = os.path.relpath(os.path.dirname(file_path), root.path)
+            dirc = root if route == "." else root.get_specify_instance(route)
+            self.notify(dirc, file_path)
+        for file_path in report.removed_files:
+            self.notify(None, file_path, removed=True)
+
+    def notify_tree(self, dirc: Directory, removed: bool = False) -> None:
+        """Report every file below 'dirc' as added (or removed)."""
+        stack = [dirc]
+        while stack:
+            node = stack.pop()
+            for file_path in node.file_member:
+                self.notify(node, file_path, removed=removed)
+            stack += node.dirc_member
+
+    def watch_tree(self, dirc: Directory) -> None:
+        """Watch every listed directory below 'dirc'."""
+        stack = [dirc]
+        while stack:
+            node = stack.pop()
+            try:
+                self.watches[self.inotify.add_watch(node.path)] = node
+            except (FileNotFoundError, NotADirectoryError):
+                # removed meanwhile, its events follow
+                continue
+            stack += [child for child in node.dirc_member if not child.pruned]
+
+    def unwatch_tree(self, dirc: Directory) -> None:
+        """Stop watching the directories below 'dirc'."""
+        nodes = set()
+        stack = [dirc]
+        while stack:
+            node = stack.pop()
+            nodes.add(id(node))
+            stack += node.dirc_member
+        for wd, node in list(self.watches.items()):
+            if id(node) in nodes:
+                del self.watches[wd]
+                self.inotify.rm_watch(wd)
+
+    def add_dirc(self, parent: Directory, dirc_name: str) -> None:
+        """Add a new directory of 'parent', watching & listing its whole subtree."""
+        if dirc_name in parent.get_dirc_index():
+            return
+
+        dirc = parent.new_member(dirc_name)
+        dirc.pruned = self.prune is not None and prune_dirc(self.prune, dirc.path)
+        parent.add_dirc(dirc)
+        if dirc.pruned:
+            return
+
+        lister = scan_dirc if parent.file_meta is None else scan_dirc_meta
+
+        def scanner(node: Directory):
+            # watch before listing, so nothing created in between is missed
+            self.watches[self.inotify.add_watch(node.path)] = node
+            return lister(node.path)
+
+        def visit(node: Directory, listing: tuple):
+            children = node.set_member(*listing, empty=node.empty, prune=self.prune)
+            return [(child, child) for child, _ in children]
+
+        try:
+            walk(dirc, dirc, visit, scanner=scanner)
+        except FileNotFoundError:
+            # removed again while being listed, its events follow
+            pass
+        self.notify_tree(dirc)
+
+    def apply_events(self, events: List[tuple]) -> None:
+        """Apply inotify events to the structure."""
+        # renames are applied as a removal & an addition, their cookies are not needed
+        for wd, mask, _, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self.resync()
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            dirc = self.watches.get(wd)
+            if dirc is None:
+                continue
+            file_path = os.path.join(dirc.path, name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_dirc(dirc, name)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    removed = dirc.remove_dirc(name)
+                    if removed is not None:
+                        if mask & IN_MOVED_FROM:
+                            self.unwatch_tree(removed)
+                        self.notify_tree(removed, removed=True)
+                continue
+
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                meta = self.file_meta(dirc, file_path)
+                if dirc.add_file(name, meta) is None:
+                    continue
+                if mask & IN_CREATE and self.is_written(file_path):
+                    self.pending.add(file_path)
+                else:
+                    self.notify(dirc, file_path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.pending.discard(file_path)
+                if dirc.remove_file(name) is not None or dirc.empty:
+                    self.notify(dirc, file_path, removed=True)
+            elif mask & IN_CLOSE_WRITE:
+                if dirc.file_meta is not None:
+                    meta = self.file_meta(dirc, file_path)
+                    if meta is not None:
+                        dirc.set_file_meta(name, meta)
+                if file_path in self.pending:
+                    self.pending.discard(file_path)
+                    self.notify(dirc, file_path)
+
+    @staticmethod
+    def file_meta(dirc: Directory, file_path: str):
+        """Metadata of a new file when 'dirc' keeps file metadata."""
+        if dirc.file_meta is None:
+            return None
+        try:
+            return stat_meta(file_path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def is_written(file_path: str) -> bool:
+        """Whether a just created file is (likely) still being written:
+        a regular file which is not another link of an existing file."""
+        try:
+            stat = os.lstat(file_path)
+        except OSError:
+            return False
+        return (stat.st_mode & 0o170000) == 0o100000 and stat.st_nlink == 1
+
+    def resync(self) -> None:
+        """Recover from lost events: refresh the structure & watch new directories."""
+        self.notify_report(
+            self.directory.refresh(prune=self.prune, metadata=self.metadata)
+        )
+        self.watch_tree(self.directory)
@@ -0,0 +1,26 @@
+"""Shared fixtures of the tests"""
+
+import pytest
+
+from material import Condition
+
+# directories of the 'tree' fixture, each holding TREE_FILES
+TREE_DIRCS = ["a", "a/b", "c"]
+TREE_FILES = {"empty.wav": b"", "full.wav": b"x" * 10, "note.txt": b"note"}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Root path of a small tree made in 'tmp_path/root'."""
+    root = tmp_path / "root"
+    for dirc in TREE_DIRCS:
+        (root / dirc).mkdir(parents=True)
+        for name, contents in TREE_FILES.items():
+            (root / dirc / name).write_bytes(contents)
+    return str(root)
+
+
+@pytest.fixture
+def wav():
+    """Fresh condition selecting the '.wav' files."""
+    return Condition().specify_extention(["wav"])
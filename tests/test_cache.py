@@ -0,0 +1,140 @@
+"""Tests of the get_path query cache of Collector"""
+
+import os
+
+import pytest
+
+from data_collect import Collector
+from material import Condition, Directory
+
+MUTATIONS = [
+    ("only_terminal", ()),
+    ("add_contain_filename", (["empty"],)),
+    ("add_exclude_filename", (["full"],)),
+    ("remove_contain_filename", (["full"],)),
+    ("remove_exclude_filename", (["x"],)),
+    ("add_contain_dirc", (["b"],)),
+    ("add_exclude_dirc", (["b"],)),
+    ("remove_contain_dirc", (["root"],)),
+    ("remove_exclude_dirc", (["x"],)),
+    ("add_contain_dirc_glob", (["b*"],)),
+    ("add_exclude_dirc_glob", (["b*"],)),
+    ("remove_contain_dirc_glob", (["r*"],)),
+    ("remove_exclude_dirc_glob", (["x*"],)),
+    ("specify_extention", (["txt"],)),
+    ("specify_exclude_extention", (["wav"],)),
+    ("remove_extentions", (["wav"],)),
+    ("specify_size", (1,)),
+    ("specify_mtime", (None, 0)),
+    ("specify_file_type", (["symlink"],)),
+    ("add_glob", (["**/c/*"],)),
+    ("add_regex", ([r".*/a/.*"],)),
+    ("remove_glob", (["**/*"],)),
+    ("remove_regex", ([r".*"],)),
+    ("add_condition_func", (lambda path: "/c/" in path,)),
+    ("reset_condition_func", ()),
+]
+
+
+def make_condition():
+    return (
+        Condition()
+        .specify_extention(["wav", "txt"])
+        .add_contain_filename(["full"])
+        .add_exclude_filename(["x"])
+        .add_contain_dirc(["root"])
+        .add_exclude_dirc(["x"])
+        .add_contain_dirc_glob(["r*"])
+        .add_exclude_dirc_glob(["x*"])
+        .add_glob(["**/*"])
+        .add_regex([r".*"])
+        .add_condition_func(lambda path: True)
+    )
+
+
+def evaluated(collector):
+    """get_path(serialize=True) of 'collector' without its cache."""
+    return (
+        Directory(collector.root_path)
+        .build_structure()
+        .get_file_path(collector.condition, serialize=True)
+    )
+
+
+def test_every_mutator_is_covered():
+    mutators = {
+        name
+        for name, method in vars(Condition).items()
+        if callable(method) and method.__annotations__.get("return") == "Condition"
+    }
+
+    assert mutators == {name for name, _ in MUTATIONS}
+
+
+@pytest.mark.parametrize("name, args", MUTATIONS, ids=[m[0] for m in MUTATIONS])
+def test_condition_mutators_invalidate(tree, name, args):
+    cond = make_condition()
+    collector = Collector(cond, tree, cache_size=4)
+    collector.get_path(serialize=True)
+    collector.get_path(serialize=True)
+    assert collector.query_cache.info()[:2] == (1, 1)
+
+    getattr(cond, name)(*args)
+
+    assert collector.get_path(serialize=True) == evaluated(collector)
+    assert collector.query_cache.misses == 2
+
+
+def add_file(dirc):
+    """Add 'a/new.wav' below 'dirc' & make the mtime of 'a' differ."""
+    with open(os.path.join(dirc.path, "a", "new.wav"), "wb") as f:
+        f.write(b"x")
+    os.utime(os.path.join(dirc.path, "a"), (0, 0))
+    return dirc
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda d: add_file(d).update_member(),
+        lambda d: add_file(d).refresh(),
+        lambda d: d.remove_member(Condition().add_contain_filename(["full"])),
+    ],
+    ids=["update_member", "refresh", "remove_member"],
+)
+def test_structure_changes_invalidate(tree, wav, change):
+    collector = Collector(wav, tree, cache_size=4)
+    before = collector.get_path(serialize=True)
+
+    change(collector.database)
+
+    assert collector.get_path(serialize=True) == evaluated(collector) != before
+    assert collector.query_cache.misses == 2
+
+
+def test_replaced_database_invalidates(tree, wav):
+    collector = Collector(wav, tree, cache_size=4)
+    collector.get_path(serialize=True)
+    os.remove(os.path.join(tree, "c", "full.wav"))
+
+    collector.database = Directory(tree).build_structure()
+
+    assert collector.get_path(serialize=True) == evaluated(collector)
+    assert collector.query_cache.misses == 2
+
+
+def test_least_recently_used_entry_is_evicted(tree):
+    conditions = [Condition().specify_extention([ext]) for ext in ["wav", "txt", "x"]]
+    collector = Collector(conditions[0], tree, cache_size=2)
+
+    for cond in conditions:
+        collector.condition = [cond]
+        collector.get_path()
+    assert len(collector.query_cache) == 2
+
+    collector.condition = [conditions[2]]
+    collector.get_path()
+    collector.condition = [conditions[0]]
+    collector.get_path()
+
+    assert collector.query_cache.info() == (1, 4, 2)
@@ -0,0 +1,29 @@
+"""Tests of data_collect"""
+
+import asyncio
+
+import pytest
+
+from data_collect import AsyncCollector, Collector
+
+
+def test_iter_path(tree, wav):
+    collector = Collector(wav, tree, lazy=True, prune=True)
+
+    assert list(collector.iter_path()) == Collector(wav, tree).get_path(serialize=True)
+
+
+def test_iter_path_without_conditions_raises(tree):
+    collector = Collector(None, tree, lazy=True, prune=True)
+
+    with pytest.raises(TypeError, match="'conditions' must be specified."):
+        next(collector.iter_path())
+
+
+def test_aiter_path_without_conditions_raises(tree):
+    async def collect():
+        collector = await AsyncCollector.create(None, tree, prune=True)
+        return [path async for path in collector.aiter_path()]
+
+    with pytest.raises(TypeError, match="'conditions' must be specified."):
+        asyncio.run(collect())
@@ -0,0 +1,40 @@
+"""Tests of material.compact"""
+
+import os
+
+import pytest
+
+from data_collect import Collector
+from material import CompactTree, Directory
+
+
+def test_queries_match_directory(tree, wav):
+    directory = Directory(tree).build_structure()
+    compact = CompactTree.build(tree).root()
+
+    assert compact.get_file_path(wav) == directory.get_file_path(wav)
+    assert compact.clone().get_file_path(wav) == directory.get_file_path(wav)
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda d, wav: d.remove_member(wav, None),
+        lambda d, wav: d.update_member(),
+        lambda d, wav: d.refresh(),
+        lambda d, wav: d.build_structure(),
+        lambda d, wav: d.add_file("z.wav"),
+        lambda d, wav: d.remove_file("full.wav"),
+        lambda d, wav: d.add_dirc(Directory("d")),
+        lambda d, wav: d.remove_dirc("a"),
+    ],
+)
+def test_mutation_raises_before_touching_files(tree, wav, call):
+    collector = Collector(wav, tree, compact=True)
+    before = collector.get_path()
+
+    with pytest.raises(TypeError):
+        call(collector.database, wav)
+
+    assert os.path.exists(os.path.join(tree, "a", "full.wav"))
+    assert collector.get_path() == before
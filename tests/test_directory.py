@@ -0,0 +1,90 @@
+"""Tests of material.directory"""
+
+import pytest
+
+from data_collect import Collector
+from material import Condition, Directory
+from material.metadata import FileMeta
+
+
+@pytest.mark.parametrize("filtered", [False, True])
+def test_clone_file_member_is_not_shared_mutably(tree, wav, filtered):
+    directory = Directory(tree).build_structure()
+    before = directory.get_file_path(Condition(), serialize=True)
+    clone = directory.clone(wav if filtered else None)
+    member = clone("a/b")
+
+    member.file_member.remove(member.file_member[0])
+    member.own_files().pop()
+    clone("c").discard_files(set(clone("c").file_member))
+    assert len(member.file_member) == (0 if filtered else 1)
+
+    directory("c").file_member.append(f"{tree}/c/x.wav")
+    directory("c").file_member += [f"{tree}/c/y.wav"]
+    assert clone("c").file_member == []
+
+    after = directory.get_file_path(Condition(), serialize=True)
+    assert sorted(after) == sorted(before + [f"{tree}/c/x.wav", f"{tree}/c/y.wav"])
+
+
+def test_clone_file_meta_is_copied_on_write(tree):
+    directory = Directory(tree).build_structure(metadata=True)
+    source = directory("c")
+    meta = source.file_meta["empty.wav"]
+    clone = directory.clone()
+
+    clone("c").set_file_meta("empty.wav", FileMeta(1, 2, False))
+    clone("c").discard_files({clone("c").file_member[0]})
+
+    assert source.file_meta["empty.wav"] == meta
+    assert sorted(source.file_meta) == ["empty.wav", "full.wav", "note.txt"]
+
+
+def test_exclude_dirc_names_are_literal():
+    cond = Condition().add_exclude_dirc(["x[1]"])
+
+    assert not cond("root/x[1]/a.wav")
+    assert cond("root/x1/a.wav")
+    assert cond.compile()("root/x1/a.wav")
+    mask = cond.evaluate_many(["root/x[1]/a.wav", "root/x1/a.wav"])
+    assert [bool(matched) for matched in mask] == [False, True]
+
+
+def test_dirc_globs():
+    cond = Condition().add_exclude_dirc_glob(["cache*"]).add_contain_dirc_glob(["spk?"])
+
+    assert cond("root/spk1/a.wav")
+    assert not cond("root/spk1/cache_0/a.wav")
+    assert not cond("root/spk10/a.wav")
+
+    cond.remove_exclude_dirc_glob(["cache*"])
+    assert cond("root/spk1/cache_0/a.wav")
+
+
+def test_glob_call_follows_changes_and_pickles():
+    import pickle
+
+    cond = Condition().specify_extention(["wav"]).add_glob(["root/**/*.wav"])
+    assert cond("root/a/b.wav") and not cond("root/a/b.txt")
+    # direct calls reuse one path automaton (& its directory state cache)
+    assert cond.predicate() is cond.predicate()
+
+    cond.specify_extention(["txt"]).add_glob(["root/**/*.txt"])
+    assert cond("root/a/b.txt")
+
+    assert pickle.loads(pickle.dumps(cond))("root/a/b.txt")
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_pruned_dircs_are_not_listed_as_instances(tree, wav, compact):
+    cond = wav.add_exclude_dirc(["b"])
+    collector = Collector(cond, tree, prune=True, compact=compact)
+
+    assert [d.path for d in collector.get_terminal_dirs(serialize=True)] == [
+        f"{tree}/c"
+    ]
+    assert sorted(d.path for d in collector.get_all_dirs(serialize=True)) == [
+        tree,
+        f"{tree}/a",
+        f"{tree}/c",
+    ]
@@ -0,0 +1,56 @@
+"""Tests of material.hashing & Collector.hash_files"""
+
+import hashlib
+import os
+
+from data_collect import Collector
+from material.hashing import hash_files
+
+
+def test_hash_files_cache_hits_and_misses(tree, wav, tmp_path):
+    cache = str(tmp_path / "hash_cache.sqlite")
+    collector = Collector(wav, tree)
+
+    first = collector.hash_files(cache=cache)
+    assert (first.hashed, first.cached, first.bytes_read) == (6, 0, 30)
+    assert first.digests[f"{tree}/c/full.wav"] == hashlib.sha256(b"x" * 10).hexdigest()
+
+    second = collector.hash_files(cache=cache)
+    assert (second.hashed, second.cached, second.bytes_read) == (0, 6, 0)
+    assert second.digests == first.digests
+
+    with open(os.path.join(tree, "c", "full.wav"), "wb") as f:
+        f.write(b"changed")
+    third = collector.hash_files(cache=cache)
+    assert (third.hashed, third.cached) == (1, 5)
+    assert third.digests[f"{tree}/c/full.wav"] == hashlib.sha256(b"changed").hexdigest()
+
+    # digests are cached per algorithm
+    other = collector.hash_files(algorithm="md5", cache=cache)
+    assert (other.hashed, other.cached) == (6, 0)
+
+
+def test_duplicates(tree, wav):
+    paths = Collector(wav, tree).get_path(serialize=True)
+    with open(os.path.join(tree, "c", "full.wav"), "wb") as f:
+        f.write(b"changed")
+
+    result = hash_files(paths, workers=2)
+
+    assert result.duplicates() == [
+        [f"{tree}/a/b/empty.wav", f"{tree}/a/empty.wav", f"{tree}/c/empty.wav"],
+        [f"{tree}/a/b/full.wav", f"{tree}/a/full.wav"],
+    ]
+    assert hash_files(paths[:1]).duplicates() == []
+
+
+def test_write_manifest(tree, wav, tmp_path):
+    result = Collector(wav, tree).hash_files()
+    manifest = tmp_path / "SHA256SUMS"
+
+    result.write_manifest(str(manifest))
+
+    lines = manifest.read_text().splitlines()
+    assert lines == [
+        f"{result.digests[path]}  {path}" for path in sorted(result.digests)
+    ]
@@ -0,0 +1,71 @@
+"""Tests of material.join & Collector.join_path"""
+
+import os
+
+import pytest
+
+from data_collect import Collector
+from material import Condition, JoinReport
+
+
+@pytest.fixture
+def roles():
+    utt = ["utt"]
+    return {
+        "audio": Condition().specify_extention(["wav"]).add_contain_filename(utt),
+        "text": Condition().specify_extention(["txt"]).add_contain_filename(utt),
+    }
+
+
+def touch(tree, *routes):
+    for route in routes:
+        with open(os.path.join(tree, route), "wb"):
+            pass
+    return [f"{tree}/{route}" for route in routes]
+
+
+def test_join_path_reports_complete_incomplete_and_duplicates(tree, wav, roles):
+    audio, text, other_audio, lone_audio, lone_text = touch(
+        tree, "a/utt1.wav", "c/utt1.txt", "c/utt1.wav", "a/b/utt2.wav", "c/utt3.txt"
+    )
+    report = JoinReport()
+
+    groups = list(Collector(wav, tree).join_path(roles, report=report))
+
+    assert len(groups) == 1
+    key, paths = groups[0]
+    assert key == "utt1" and paths["text"] == text
+    assert paths["audio"] in (audio, other_audio)
+
+    assert report.complete == 1
+    assert report.incomplete == {
+        "utt2": {"audio": lone_audio},
+        "utt3": {"text": lone_text},
+    }
+    assert report.missing(["audio", "text"]) == {"utt2": ["text"], "utt3": ["audio"]}
+    assert report.duplicates == [
+        ("utt1", "audio", other_audio if paths["audio"] == audio else audio)
+    ]
+
+
+def test_join_path_with_key(tree, wav):
+    roles = {"empty": Condition().add_contain_filename(["empty"]), "full": wav}
+    report = JoinReport()
+
+    groups = dict(
+        Collector(wav, tree).join_path(roles, key=os.path.dirname, report=report)
+    )
+
+    # 'full' takes the first of empty.wav & full.wav of every directory
+    assert sorted(groups) == [f"{tree}/a", f"{tree}/a/b", f"{tree}/c"]
+    assert report.complete == 3 and report.incomplete == {}
+    assert len(report.duplicates) == 3
+
+
+def test_join_path_requires_conditions(tree, wav):
+    collector = Collector(wav, tree)
+
+    with pytest.raises(TypeError):
+        collector.join_path([wav])
+    with pytest.raises(TypeError):
+        collector.join_path({"audio": None})
@@ -0,0 +1,47 @@
+"""Tests of material.manifest & Collector.export_manifest"""
+
+import os
+import pickle
+
+import pytest
+
+from data_collect import Collector
+from material import Manifest, write_manifest
+
+
+@pytest.mark.parametrize("metadata", [False, True])
+def test_export_manifest(tree, wav, tmp_path, monkeypatch, metadata):
+    if metadata:
+        wav.specify_size(min_size=0)
+    collector = Collector(wav, tree)
+    expect = collector.get_path(rank=0, world_size=1)
+    sizes = [os.path.getsize(path) for path in expect]
+    if metadata:
+        # sizes come from the metadata captured by the walk
+        monkeypatch.setattr(os.path, "getsize", None)
+
+    manifest_path = str(tmp_path / "files.manifest")
+    assert collector.export_manifest(manifest_path, dircs=True, sizes=True) == 6
+
+    with Manifest(manifest_path) as manifest:
+        assert list(manifest) == expect
+        assert [manifest.size(i) for i in range(len(manifest))] == sizes
+        assert manifest.dirc_path(manifest.dirc_id(-1)) == os.path.dirname(expect[-1])
+        assert list(pickle.loads(pickle.dumps(manifest))) == expect
+        with pytest.raises(IndexError):
+            manifest[len(manifest)]
+
+
+def test_empty_and_truncated_manifest(tmp_path):
+    path = str(tmp_path / "files.manifest")
+    write_manifest(path, [])
+    with Manifest(path) as manifest:
+        assert len(manifest) == 0 and not manifest.has_sizes()
+
+    write_manifest(path, ["a/b.wav", "a/c.wav"], sizes=[1, 2])
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-9])
+    with pytest.raises(ValueError):
+        Manifest(path)
@@ -0,0 +1,87 @@
+"""Tests of metadata rules answered from captured FileMeta"""
+
+import glob
+import os
+import time
+
+import pytest
+
+import material.metadata
+from data_collect import Collector
+from material import Directory, Watcher, WalkStats
+
+
+@pytest.fixture
+def non_empty(wav):
+    return wav.specify_size(min_size=1)
+
+
+@pytest.fixture
+def no_stat(monkeypatch):
+    def stat_meta(path):
+        raise AssertionError(f"stat of {path}")
+
+    monkeypatch.setattr(material.metadata, "stat_meta", stat_meta)
+
+
+def expected(root):
+    return sorted(glob.glob(f"{root}/**/full.wav", recursive=True))
+
+
+def rewrite_in_place(tree):
+    """Empty 'c/full.wav' & set 'a/full.wav' a day back, keeping the directory mtimes."""
+    with open(os.path.join(tree, "c", "full.wav"), "r+b") as f:
+        f.truncate()
+    day_ago = time.time() - 86400
+    os.utime(os.path.join(tree, "a", "full.wav"), (day_ago, day_ago))
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_snapshot_follows_files_changed_in_place(tree, tmp_path, non_empty, compact):
+    snapshot = str(tmp_path / "snapshot")
+    recent = non_empty.specify_mtime(newer_than=time.time() - 3600)
+    Collector(recent, tree, snapshot=snapshot).get_path()
+    rewrite_in_place(tree)
+
+    collector = Collector(recent, tree, snapshot=snapshot, compact=compact)
+
+    assert collector.get_path(serialize=True) == [f"{tree}/a/b/full.wav"]
+    paths = [f"{tree}/a/full.wav", f"{tree}/c/full.wav"]
+    assert collector.get_file_sizes(paths) == [10, 0]
+
+
+def test_compact_keeps_metadata(tree, no_stat, non_empty):
+    collector = Collector(non_empty, tree, compact=True)
+
+    assert sorted(collector.get_path(serialize=True)) == expected(tree)
+
+
+def test_poll_keeps_metadata_of_listed_directories(tree, non_empty):
+    collector = Collector(non_empty, tree)
+    rewrite_in_place(tree)
+    with open(os.path.join(tree, "a", "new.wav"), "wb") as f:
+        f.write(b"x")
+
+    found = []
+    Watcher(collector.database, non_empty, found.append, backend="poll").poll()
+
+    assert found == [f"{tree}/a/new.wav"]
+    assert collector.database("a").file_meta is not None
+    assert collector.database("c").file_meta is None
+    assert sorted(collector.get_path(serialize=True)) == [
+        f"{tree}/a/b/full.wav",
+        f"{tree}/a/full.wav",
+        f"{tree}/a/new.wav",
+    ]
+
+
+def test_stats_count_file_stats(tree, non_empty):
+    stats = WalkStats()
+    Directory(tree).build_structure(stats=stats, metadata=True)
+    # a stat & a scandir per directory, a stat per file
+    assert stats.fs_calls == 4 * 2 + 9
+
+    stats = WalkStats()
+    Directory(tree).build_structure().get_file_path(non_empty, stats=stats)
+    # the '.wav' files are stat'ed by the size rule
+    assert stats.fs_calls == 6
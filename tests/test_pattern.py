@@ -0,0 +1,73 @@
+"""Tests of material.pattern & path patterns of Condition"""
+
+import pytest
+
+from data_collect import Collector
+from material import Condition
+from material.pattern import PathMatcher
+
+
+@pytest.mark.parametrize(
+    "globs, regexes, path, matched",
+    [
+        # '**' at the start
+        (["**/*.wav"], [], "a.wav", True),
+        (["**/*.wav"], [], "root/x/y/a.wav", True),
+        (["**/*.wav"], [], "root/a.txt", False),
+        # '**' in the middle, matching no component as well
+        (["root/**/train/*.wav"], [], "root/train/a.wav", True),
+        (["root/**/train/*.wav"], [], "root/x/y/train/a.wav", True),
+        (["root/**/train/*.wav"], [], "root/train/x/a.wav", False),
+        (["root/**/train/*.wav"], [], "other/train/a.wav", False),
+        # '**' at the end
+        (["root/a/**"], [], "root/a/x.wav", True),
+        (["root/a/**"], [], "root/a/b/c/x.wav", True),
+        (["root/a/**"], [], "root/b/x.wav", False),
+        # regex segments match whole components
+        ([], [r"root/spk\d+/.*\.npy"], "root/spk12/x.npy", True),
+        ([], [r"root/spk\d+/.*\.npy"], "root/spkA/x.npy", False),
+        ([], [r"root/spk\d+/.*\.npy"], "root/spk1/x.npyz", False),
+        ([], [r"root/spk\d+/.*\.npy"], "root/spk1/a/x.npy", False),
+        # absolute roots
+        (["/data/**/*.wav"], [], "/data/a/x.wav", True),
+        (["/data/**/*.wav"], [], "data/a/x.wav", False),
+        ([], [r"/data/.*\.wav"], "/data/x.wav", True),
+        ([], [r"/data/.*\.wav"], "data/x.wav", False),
+    ],
+)
+def test_path_matcher(globs, regexes, path, matched):
+    assert PathMatcher(globs, regexes).match(path) is matched
+
+
+def test_path_matcher_prunes():
+    matcher = PathMatcher(["root/a/*.wav"])
+
+    assert not matcher.prunes("root")
+    assert not matcher.prunes("root/a")
+    assert matcher.prunes("root/a/b")
+    assert matcher.prunes("root/c")
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize(
+    "make_condition",
+    [
+        lambda tree: Condition().add_glob([f"{tree}/a/b/*.wav"]),
+        lambda tree: Condition().add_regex([rf"{tree}/a/b/.*\.wav"]),
+    ],
+    ids=["glob", "regex"],
+)
+def test_prune_keeps_matched_files(tree, make_condition, lazy):
+    cond = make_condition(tree)
+    expected = Collector(cond, tree, stats=True)
+    collector = Collector(cond, tree, prune=True, stats=True, lazy=lazy)
+
+    if lazy:
+        paths = list(collector.iter_path())
+    else:
+        paths = collector.get_path(serialize=True)
+
+    assert paths == expected.get_path(serialize=True)
+    assert sorted(paths) == [f"{tree}/a/b/empty.wav", f"{tree}/a/b/full.wav"]
+    # 'c' is never listed
+    assert collector.stats.dircs_listed == expected.stats.dircs_listed - 1
@@ -0,0 +1,84 @@
+"""Tests of Directory.refresh & ChangeReport"""
+
+import os
+import shutil
+import time
+
+from material import Condition, Directory
+
+
+def age(tree):
+    """Set the directory mtimes a day back, so any later change is newer."""
+    day_ago = time.time() - 86400
+    for dirc_path, _, _ in os.walk(tree):
+        os.utime(dirc_path, (day_ago, day_ago))
+
+
+def files(directory):
+    return sorted(directory.get_file_path(Condition(), serialize=True))
+
+
+def test_refresh_reports_changes(tree):
+    age(tree)
+    directory = Directory(tree).build_structure()
+    kept = directory("c")
+
+    with open(os.path.join(tree, "a", "new.wav"), "wb") as f:
+        f.write(b"x")
+    os.remove(os.path.join(tree, "c", "note.txt"))
+    os.mkdir(os.path.join(tree, "c", "d"))
+    with open(os.path.join(tree, "c", "d", "x.wav"), "wb") as f:
+        f.write(b"x")
+    shutil.rmtree(os.path.join(tree, "a", "b"))
+
+    report = directory.refresh()
+
+    assert report
+    assert sorted(report.added_files) == [f"{tree}/a/new.wav", f"{tree}/c/d/x.wav"]
+    assert sorted(report.removed_files) == [
+        f"{tree}/a/b/empty.wav",
+        f"{tree}/a/b/full.wav",
+        f"{tree}/a/b/note.txt",
+        f"{tree}/c/note.txt",
+    ]
+    assert report.added_dircs == [f"{tree}/c/d"]
+    assert report.removed_dircs == [f"{tree}/a/b"]
+    assert sorted(report.rescanned_dircs) == [
+        f"{tree}/a",
+        f"{tree}/c",
+        f"{tree}/c/d",
+    ]
+    assert directory("c") is kept
+    assert files(directory) == files(Directory(tree).build_structure())
+
+
+def test_unchanged_dircs_are_not_rescanned(tree):
+    age(tree)
+    directory = Directory(tree).build_structure()
+    before = files(directory)
+    member = directory("a/b")
+
+    report = directory.refresh()
+
+    assert not report and report.rescanned_dircs == []
+    assert directory("a/b") is member
+    assert files(directory) == before
+
+
+def test_pruned_dircs_are_listed_once_prune_stops_matching(tree):
+    directory = Directory(tree).build_structure(prune=lambda name: name == "b")
+    assert directory("a/b").pruned and directory("a/b").file_member == []
+
+    report = directory.refresh(prune=lambda name: name == "b")
+    assert directory("a/b").pruned and report.added_files == []
+
+    report = directory.refresh(prune=lambda name: False)
+
+    assert not directory("a/b").pruned
+    assert f"{tree}/a/b" in report.rescanned_dircs
+    assert sorted(report.added_files) == [
+        f"{tree}/a/b/empty.wav",
+        f"{tree}/a/b/full.wav",
+        f"{tree}/a/b/note.txt",
+    ]
+    assert files(directory) == files(Directory(tree).build_structure())
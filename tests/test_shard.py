@@ -0,0 +1,67 @@
+"""Tests of material.walker.shard_walk & rank shares of Collector.get_path"""
+
+import os
+
+import pytest
+
+from data_collect import Collector
+from material import Directory
+from material.walker import scan_dirc, shard_walk, walk
+
+
+def visited(walker, tree, **kwargs):
+    """(path, listing) pairs in the order 'walker' passes them to visit()."""
+    calls = []
+
+    def visit(path, listing):
+        calls.append((path, listing))
+        children = [os.path.join(path, name) for name in listing[1]]
+        return [(child, child) for child in children]
+
+    walker(tree, tree, visit, **kwargs)
+    return calls
+
+
+def test_shard_walk_replays_listings_in_order(tree):
+    os.makedirs(os.path.join(tree, "c", "d", "e"))
+
+    calls = visited(shard_walk, tree, processes=2)
+
+    assert calls == visited(walk, tree)
+    for path, listing in calls:
+        assert listing[:2] == scan_dirc(path)[:2]
+
+
+def test_shard_walk_builds_same_structure(tree, wav):
+    sharded = Directory(tree).build_structure(processes=2)
+    single = Directory(tree).build_structure()
+
+    assert sharded.get_file_path(wav, serialize=True) == single.get_file_path(
+        wav, serialize=True
+    )
+    assert [d.path for d in sharded.get_all_instances(serialize=True)] == [
+        d.path for d in single.get_all_instances(serialize=True)
+    ]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("world_size", [1, 2, 4, 7])
+def test_rank_shares_are_disjoint_and_complete(tree, wav, processes, world_size):
+    collector = Collector(wav, tree, processes=processes)
+
+    shares = [
+        collector.get_path(rank=rank, world_size=world_size)
+        for rank in range(world_size)
+    ]
+
+    every = sorted(path for share in shares for path in share)
+    assert every == sorted(collector.get_path(serialize=True))
+    assert len(set(every)) == len(every)
+    assert max(map(len, shares)) - min(map(len, shares)) <= 1
+
+
+def test_invalid_rank_raises(tree, wav):
+    collector = Collector(wav, tree)
+
+    with pytest.raises(ValueError):
+        collector.get_path(rank=2, world_size=2)
@@ -0,0 +1,127 @@
+"""Tests of material.transfer, Directory.copy_file & Directory.remove_member"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from material import Directory
+from material.transfer import kernel_copy, remove_files, transfer_one
+
+SOURCE = b"x" * 10
+
+
+def test_copy(tree, wav, tmp_path):
+    src = Path(tree) / "c"
+    out = tmp_path / "out"
+    out.mkdir()
+
+    progress = Directory(str(src)).build_structure().copy_file(str(out), wav, None)
+
+    assert progress.done == 2 and progress.bytes == len(SOURCE)
+    assert (out / "full.wav").read_bytes() == SOURCE
+
+
+def test_override_symlink_to_source_raises(tree, wav, tmp_path):
+    src = Path(tree) / "c"
+    out = tmp_path / "out"
+    out.mkdir()
+    dirc = Directory(str(src)).build_structure()
+    dirc.copy_file(str(out), wav, None, mode="symlink")
+
+    with pytest.raises(shutil.SameFileError):
+        dirc.copy_file(str(out), wav, None, override=True)
+
+    assert (src / "full.wav").read_bytes() == SOURCE
+
+
+def test_override_hardlink_to_source_raises(tree, wav, tmp_path):
+    src = Path(tree) / "c"
+    out = tmp_path / "out"
+    out.mkdir()
+    dirc = Directory(str(src)).build_structure()
+    dirc.copy_file(str(out), wav, None, mode="hardlink")
+
+    with pytest.raises(shutil.SameFileError):
+        dirc.copy_file(str(out), wav, None, override=True)
+
+    assert (src / "full.wav").read_bytes() == SOURCE
+
+
+def test_copy_onto_itself_raises(tree, wav, tmp_path):
+    src = Path(tree) / "c"
+    dirc = Directory(str(src)).build_structure()
+
+    with pytest.raises(shutil.SameFileError):
+        dirc.copy_file(str(src), wav, None, override=True, workers=2)
+    with pytest.raises(shutil.SameFileError):
+        kernel_copy(str(src / "full.wav"), str(src / "full.wav"))
+
+    assert (src / "full.wav").read_bytes() == SOURCE
+
+
+@pytest.mark.parametrize("link", [os.symlink, os.link])
+def test_override_replaces_link_to_other_file(tree, tmp_path, link):
+    src = Path(tree) / "c"
+    other = tmp_path / "other.wav"
+    other.write_bytes(b"other")
+    dst = tmp_path / "copy.wav"
+    link(str(other), str(dst))
+
+    transfer_one(str(src / "full.wav"), str(dst), "copy", override=True)
+
+    assert not dst.is_symlink() and dst.read_bytes() == SOURCE
+    assert other.read_bytes() == b"other"
+
+
+def test_remove_files(tmp_path):
+    paths = []
+    for name in ["a", "b", "c"]:
+        (tmp_path / name).write_bytes(b"")
+        paths.append(str(tmp_path / name))
+    os.remove(paths[2])
+
+    planned = remove_files([paths], dry_run=True)
+    assert planned.removed == paths and all(map(os.path.exists, paths[:2]))
+
+    summary = remove_files([paths[:1], paths[1:]], workers=2)
+    assert sorted(summary.removed) == paths and summary.failed == []
+    assert not any(map(os.path.exists, paths))
+
+
+def test_remove_files_reports_failures(tmp_path):
+    (tmp_path / "dirc").mkdir()
+    (tmp_path / "a").write_bytes(b"")
+
+    summary = remove_files([[str(tmp_path / "a"), str(tmp_path / "dirc")]])
+
+    assert summary.removed == [str(tmp_path / "a")]
+    assert [path for path, _ in summary.failed] == [str(tmp_path / "dirc")]
+
+
+def test_remove_member_is_silent_by_default(tree, wav, capsys):
+    dirc = Directory(tree).build_structure()
+
+    assert dirc.remove_member(wav) == 6
+    assert capsys.readouterr().out == ""
+
+    assert dirc.get_file_path(wav, serialize=True) == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_copy_prints_aggregated_progress(tree, wav, tmp_path, capsys, workers):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "empty.wav").write_bytes(b"")
+    seen = []
+
+    Directory(tree).build_structure()("c").copy_file(
+        str(out), wav, workers=workers, progress=lambda p: seen.append(p.done)
+    )
+
+    assert capsys.readouterr().out.splitlines() == [
+        f"exst: {tree}/c/empty.wav -> {out}/empty.wav",
+        "copy: 1/1 files, 10 bytes",
+    ]
+    assert seen == [1]
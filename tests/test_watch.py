@@ -0,0 +1,110 @@
+"""Tests of material.watch"""
+
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from data_collect import Collector
+from material import Watcher
+
+
+def wait_for(predicate, timeout=10.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.mark.parametrize("backend", ["auto", "poll"])
+def test_context_manager(tree, wav, backend):
+    collector = Collector(wav, tree)
+    found = []
+
+    with collector.watch(found.append, poll_interval=0.05, backend=backend) as watcher:
+        with open(os.path.join(tree, "a", "x.wav"), "w") as f:
+            f.write("x")
+        with open(os.path.join(tree, "a", "y.txt"), "w") as f:
+            f.write("y")
+        assert wait_for(lambda: found != [])
+        with watcher.lock:
+            assert f"{tree}/a/x.wav" in collector.get_path(serialize=True)
+
+    assert found == [f"{tree}/a/x.wav"]
+
+
+def test_poll_error_is_reported_and_retried(tree, wav):
+    collector = Collector(wav, tree)
+    found = []
+    errors = []
+    lock = threading.Lock()
+
+    def on_error(err):
+        with lock:
+            errors.append(err)
+
+    watcher = collector.watch(
+        found.append, poll_interval=0.05, backend="poll", on_error=on_error
+    )
+    try:
+        shutil.rmtree(tree)
+        assert wait_for(lambda: errors != [])
+        assert isinstance(errors[0], FileNotFoundError)
+        assert isinstance(watcher.error, OSError)
+
+        os.makedirs(os.path.join(tree, "b"))
+        with open(os.path.join(tree, "b", "x.wav"), "w") as f:
+            f.write("x")
+        assert wait_for(lambda: found != [])
+        assert found == [f"{tree}/b/x.wav"]
+        assert wait_for(lambda: watcher.error is None)
+    finally:
+        watcher.stop()
+
+
+def test_compact_database_cannot_be_watched(tree, wav):
+    collector = Collector(wav, tree, compact=True)
+
+    with pytest.raises(TypeError):
+        collector.watch(print, backend="poll")
+
+
+def test_failed_start_closes_inotify(tree, wav, monkeypatch):
+    watcher = Watcher(Collector(wav, tree).database, wav, backend="inotify")
+
+    def watch_tree(dirc):
+        raise RuntimeError("watch_tree")
+
+    monkeypatch.setattr(watcher, "watch_tree", watch_tree)
+    with pytest.raises(RuntimeError):
+        watcher.start()
+    assert watcher.inotify is None
+
+
+@pytest.mark.parametrize("backend", ["auto", "poll"])
+def test_callback_error_keeps_watching(tree, wav, backend):
+    collector = Collector(wav, tree)
+    found = []
+    errors = []
+
+    def callback(path):
+        if path.endswith("bad.wav"):
+            raise ValueError(path)
+        found.append(path)
+
+    with collector.watch(
+        callback, poll_interval=0.05, backend=backend, on_error=errors.append
+    ):
+        with open(os.path.join(tree, "a", "bad.wav"), "w") as f:
+            f.write("x")
+        assert wait_for(lambda: errors != [])
+        with open(os.path.join(tree, "c", "good.wav"), "w") as f:
+            f.write("x")
+        assert wait_for(lambda: found != [])
+
+    assert [type(err) for err in errors] == [ValueError]
+    assert found == [f"{tree}/c/good.wav"]